@@ -0,0 +1,37 @@
+import numpy as np
+
+# Upper bound on the number of gaps drawn at a time
+MAX_BATCH = 1 << 22
+
+
+# Pair (i, j), j < i, of every index k into the lower triangle k = i * (i - 1) / 2 + j
+def _triangle_pairs(k):
+    i = ((1 + np.sqrt(1 + 8 * k.astype(np.float64))) / 2).astype(np.int64)
+    # The square root can be off by one for very large k
+    i -= i * (i - 1) // 2 > k
+    i += (i + 1) * i // 2 <= k
+    return i, k - i * (i - 1) // 2
+
+
+# Sorted indices of the present slots in [first, last) when each slot is present with probability p
+# The gaps between present slots are geometric, so only the present slots are visited
+def _present_slots(first, last, p, rng):
+    if p <= 0 or last <= first:
+        return np.empty(0, dtype=np.int64)
+    p = min(p, 1.0)
+    slots = []
+    position = first - 1
+    while position < last:
+        remaining = last - position - 1
+        batch = int(min(remaining * p + 6 * np.sqrt(remaining * p) + 64, MAX_BATCH))
+        chosen = position + np.cumsum(rng.geometric(p, size=batch))
+        position = int(chosen[-1])
+        slots.append(chosen[chosen < last])
+    return np.concatenate(slots)
+
+
+# Edges (u, v), v < u, of a G(n, p) random graph; every pair is present with probability p
+# Same sampler as Assignment6's generators.erdos_renyi_edges: the same seed gives the same edges
+# The time is proportional to the number of edges instead of n(n-1)/2
+def random_edges(n, p, rng=None):
+    return _triangle_pairs(_present_slots(0, n * (n - 1) // 2, p, np.random.default_rng(rng)))
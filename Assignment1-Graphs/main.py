@@ -1,6 +1,7 @@
 import networkx as nx
 import matplotlib.pyplot as plt
 from numpy import log as ln
+from erdos_renyi import random_edges
 
 
 # Read a graph from an external file in adjacency list format
@@ -54,12 +55,11 @@ def create_random_graph(n, c):
         # Set up p
         p = c*(ln(n) / n)
         nodes = [str(i) for i in range(n)]  # Generate node names as strings from '0' to 'n-1'
-        # Create an Erdos-Renyi graph with n and p
-        G = nx.erdos_renyi_graph(n, p)
-        # Create a mapping from old nodes to new nodes
-        mapping = {old_node: new_node for old_node, new_node in zip(G.nodes(), nodes)}
-        # Relabel the nodes using the mapping
-        G = nx.relabel_nodes(G, mapping)
+        # Create an Erdos-Renyi graph with n and p, with the string labels from the start
+        src, dst = random_edges(n, p)
+        G = nx.Graph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from(zip(map(str, src.tolist()), map(str, dst.tolist())))
         print(f"Erdos-Renyi random graph with {n} nodes created successfully.")
         # Return the graph G to main
         return G
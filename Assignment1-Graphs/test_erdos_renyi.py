@@ -0,0 +1,26 @@
+import os
+import sys
+import numpy as np
+import erdos_renyi
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Assignment6'))
+import generators  # noqa: E402
+
+
+def test_same_edges_as_generators(monkeypatch):
+    # A small batch bound so the samplers also draw their gaps over several batches
+    monkeypatch.setattr(erdos_renyi, 'MAX_BATCH', 64)
+    monkeypatch.setattr(generators, 'MAX_BATCH', 64)
+    for n, p, seed in ((0, 0.5, 1), (1, 0.5, 1), (2, 1.0, 2), (50, 0.1, 3), (300, 0.02, 4), (100, 0.0, 5)):
+        u, v = erdos_renyi.random_edges(n, p, seed)
+        expected_u, expected_v = generators.erdos_renyi_edges(n, p, np.random.default_rng(seed))
+        assert np.array_equal(u, expected_u) and np.array_equal(v, expected_v)
+
+
+def test_edges_are_distinct_pairs():
+    u, v = erdos_renyi.random_edges(200, 0.05, 7)
+    assert np.all(v < u) and np.all(u < 200)
+    assert len(set(zip(u.tolist(), v.tolist()))) == len(u)
+    # Complete graph for p = 1
+    u, v = erdos_renyi.random_edges(20, 1.0, 7)
+    assert len(u) == 20 * 19 // 2
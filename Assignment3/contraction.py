@@ -0,0 +1,226 @@
+import heapq
+import numpy as np
+import networkx as nx
+
+# Nodes a witness search may settle before it gives up (and a shortcut is added to be safe)
+WITNESS_SETTLE_LIMIT = 500
+INDEX_SUFFIX = '.ch.npz'
+
+
+# Index file of a network file, one per kind of costs ('b' free-flow, 'ab' single driver)
+def index_name(file_name, costs_name='b'):
+    return f"{file_name}.{costs_name}{INDEX_SUFFIX}"
+
+
+# Dijkstra from source over the remaining graph, skipping the node being contracted, that stops once every
+# target is settled, at max_cost or after WITNESS_SETTLE_LIMIT settled nodes. Returns the distances found
+def _witness_distances(out_edges, source, skipped, targets, max_cost):
+    dist = {source: 0.0}
+    settled = set()
+    remaining = len(targets)
+    heap = [(0.0, source)]
+    while heap and remaining and len(settled) < WITNESS_SETTLE_LIMIT:
+        d, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        if d > max_cost:
+            break
+        settled.add(u)
+        if u in targets:
+            remaining -= 1
+        for v, cost in out_edges[u].items():
+            if v != skipped and d + cost < dist.get(v, float('inf')):
+                dist[v] = d + cost
+                heapq.heappush(heap, (d + cost, v))
+    return dist
+
+
+# Shortcuts (u, w, cost) needed to keep every shortest path when v is removed from the remaining graph
+def _shortcuts(out_edges, in_edges, v):
+    shortcuts = []
+    if not out_edges[v]:
+        return shortcuts
+    longest = max(out_edges[v].values())
+    for u, to_v in in_edges[v].items():
+        dist = _witness_distances(out_edges, u, v, out_edges[v], to_v + longest)
+        for w, from_v in out_edges[v].items():
+            if w != u and to_v + from_v < dist.get(w, float('inf')):
+                shortcuts.append((u, w, to_v + from_v))
+    return shortcuts
+
+
+# Contraction order priority: twice the edge difference (shortcuts added minus edges removed) plus the
+# number of neighbors already contracted, which spreads the contraction evenly over the network
+def _priority(out_edges, in_edges, v, contracted_neighbors):
+    removed = len(out_edges[v]) + len(in_edges[v])
+    return 2 * (len(_shortcuts(out_edges, in_edges, v)) - removed) + contracted_neighbors[v]
+
+
+# Upward adjacency as CSR arrays from edge arrays (tail -> head with cost)
+def _csr(n, tails, heads, costs):
+    order = np.lexsort((heads, tails))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tails, minlength=n), out=indptr[1:])
+    return indptr, heads[order], costs[order]
+
+
+# Contraction hierarchy of a traffic network under fixed edge costs (free-flow costs b by default).
+# Nodes are contracted in order of edge difference with lazy updates; the upward graph holds the edges
+# towards higher ranked nodes, the downward graph the reversed edges coming down from higher ranked nodes.
+# Shortcuts remember the contracted node they skip so paths can be unpacked
+class ContractionHierarchy:
+    def __init__(self, network, costs, rank, shortcut_tail, shortcut_head, shortcut_cost, shortcut_middle):
+        self.network = network
+        self.costs = costs
+        self.rank = rank
+        self.shortcut_tail = shortcut_tail
+        self.shortcut_head = shortcut_head
+        self.shortcut_cost = shortcut_cost
+        self.shortcut_middle = shortcut_middle
+        n = network.number_of_nodes()
+        # Cheapest original edge between every pair of nodes (parallel edges keep the cheapest)
+        order = np.lexsort((costs, network.head, network.tail))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (network.tail[order][1:] != network.tail[order][:-1]) | \
+            (network.head[order][1:] != network.head[order][:-1])
+        edges = order[first & (network.tail[order] != network.head[order])]
+        self._edge_ids = {(int(u), int(v)): int(k) for u, v, k in
+                          zip(network.tail[edges], network.head[edges], edges)}
+        self._middle = {(int(u), int(w)): int(v) for u, w, v in zip(shortcut_tail, shortcut_head, shortcut_middle)}
+        # A shortcut is only added when it is cheaper than the edge between the same nodes, which it replaces
+        edges = np.array([k for k in edges if (int(network.tail[k]), int(network.head[k])) not in self._middle],
+                         dtype=np.int64)
+        tails = np.concatenate((network.tail[edges], shortcut_tail)).astype(np.int64)
+        heads = np.concatenate((network.head[edges], shortcut_head)).astype(np.int64)
+        weights = np.concatenate((np.asarray(costs)[edges], shortcut_cost)).astype(np.float64)
+        up = rank[heads] > rank[tails]
+        self.up = _csr(n, tails[up], heads[up], weights[up])
+        self.down = _csr(n, heads[~up], tails[~up], weights[~up])
+        # Python lists of the same arrays, the query touches single entries where numpy scalars are slow
+        self._searches = [tuple(array.tolist() for array in graph) for graph in (self.up, self.down)]
+
+    @classmethod
+    def build(cls, network, costs=None):
+        costs = network.b if costs is None else costs
+        n = network.number_of_nodes()
+        out_edges = [dict() for _ in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for u, v, cost in zip(network.tail.tolist(), network.head.tolist(), np.asarray(costs, dtype=float).tolist()):
+            if u != v and cost < out_edges[u].get(v, float('inf')):
+                out_edges[u][v] = cost
+                in_edges[v][u] = cost
+        contracted_neighbors = [0] * n
+        heap = [(_priority(out_edges, in_edges, v, contracted_neighbors), v) for v in range(n)]
+        heapq.heapify(heap)
+        rank = np.zeros(n, dtype=np.int64)
+        shortcuts = {}
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            # Lazy update: contract only if v is still no worse than the next candidate
+            priority = _priority(out_edges, in_edges, v, contracted_neighbors)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+            for u, w, cost in _shortcuts(out_edges, in_edges, v):
+                if cost < out_edges[u].get(w, float('inf')):
+                    out_edges[u][w] = cost
+                    in_edges[w][u] = cost
+                    shortcuts[(u, w)] = (cost, v)
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbors[u] += 1
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                contracted_neighbors[w] += 1
+            out_edges[v], in_edges[v] = {}, {}
+            rank[v] = order
+            order += 1
+        ends = np.array(list(shortcuts), dtype=np.int64).reshape(-1, 2)
+        values = np.array(list(shortcuts.values()), dtype=np.float64).reshape(-1, 2)
+        return cls(network, np.asarray(costs), rank, ends[:, 0], ends[:, 1], values[:, 0],
+                   values[:, 1].astype(np.int64))
+
+    # Whether the hierarchy was built on these edge costs
+    def matches(self, costs):
+        return costs is self.costs or np.array_equal(costs, self.costs)
+
+    def save(self, file_name):
+        np.savez(file_name, costs=self.costs, rank=self.rank, shortcut_tail=self.shortcut_tail,
+                 shortcut_head=self.shortcut_head, shortcut_cost=self.shortcut_cost,
+                 shortcut_middle=self.shortcut_middle, up_indptr=self.up[0], up_heads=self.up[1],
+                 up_costs=self.up[2], down_indptr=self.down[0], down_heads=self.down[1],
+                 down_costs=self.down[2])
+
+    # Load a saved hierarchy, None when it was built for another network or other costs
+    @classmethod
+    def load(cls, network, file_name, costs=None):
+        costs = network.b if costs is None else costs
+        try:
+            with np.load(file_name) as index:
+                if len(index['rank']) != network.number_of_nodes() or not np.array_equal(index['costs'], costs):
+                    return None
+                return cls(network, np.asarray(costs), index['rank'], index['shortcut_tail'],
+                           index['shortcut_head'], index['shortcut_cost'], index['shortcut_middle'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # Node path of an edge of the hierarchy, shortcuts unpacked into the edges they stand for
+    def _unpack(self, u, w):
+        middle = self._middle.get((u, w))
+        if middle is None:
+            return [u, w]
+        return self._unpack(u, middle)[:-1] + self._unpack(middle, w)
+
+    # Bidirectional upward Dijkstra between dense ids; each side stops once its smallest key reaches the
+    # best meeting cost. Returns (cost, node id path) or (inf, None)
+    def query(self, source, target):
+        sides = []
+        for (indptr, heads, costs), start in zip(self._searches, (source, target)):
+            sides.append((indptr, heads, costs, {start: 0.0}, {start: start}, [(0.0, start)]))
+        best, meet = float('inf'), None
+        active = [True, True]
+        while active[0] or active[1]:
+            for i, (indptr, heads, costs, dist, parent, heap) in enumerate(sides):
+                if not active[i]:
+                    continue
+                if not heap or heap[0][0] >= best:
+                    active[i] = False
+                    continue
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                other = sides[1 - i][3]
+                if u in other and d + other[u] < best:
+                    best, meet = d + other[u], u
+                for k in range(indptr[u], indptr[u + 1]):
+                    v, cost = heads[k], costs[k]
+                    if d + cost < dist.get(v, float('inf')):
+                        dist[v] = d + cost
+                        parent[v] = u
+                        heapq.heappush(heap, (d + cost, v))
+        if meet is None:
+            return float('inf'), None
+        up_path = [meet]
+        while sides[0][4][up_path[-1]] != up_path[-1]:
+            up_path.append(sides[0][4][up_path[-1]])
+        up_path.reverse()
+        down_path = [meet]
+        while sides[1][4][down_path[-1]] != down_path[-1]:
+            down_path.append(sides[1][4][down_path[-1]])
+        hops = up_path + down_path[1:]
+        path = [hops[0]]
+        for u, w in zip(hops[:-1], hops[1:]):
+            path += self._unpack(u, w)[1:]
+        return best, path
+
+    # Edge ids of the shortest path between two node numbers, like TrafficNetwork.shortest_path_edges
+    def shortest_path_edges(self, source, target):
+        source, target = self.network.node_id(source), self.network.node_id(target)
+        if source == target:
+            return []
+        cost, path = self.query(source, target)
+        if path is None:
+            raise nx.NetworkXNoPath(f"No path found from {self.network.nodes[source]} "
+                                    f"to {self.network.nodes[target]}.")
+        return [self._edge_ids[(u, v)] for u, v in zip(path[:-1], path[1:])]
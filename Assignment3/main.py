@@ -1,6 +1,9 @@
+import numpy as np
 import networkx as nx
 from numpy import log as ln
 import matplotlib.pyplot as plt
+from traffic_network import read_traffic_network
+from contraction import ContractionHierarchy, index_name
 
 
 # Read a graph from an external file in adjacency list format
@@ -34,30 +37,20 @@ def read_graph(file_name):
         return None
 
 
+# Read a traffic network ("u v a b" rows, latency a*x + b) once into arrays
+# Returns the networkx view (weight b) for the other menu options and the network for equilibrium and plotting
 def read_weighted_digraph(file_name):
     try:
-        # Create an empty graph
-        weights = list()
-        G = nx.DiGraph()
-        with open(file_name, 'r') as file:
-            for line in file:
-                parts = line.strip().split()
-                source = int(parts[0])
-                target = int(parts[1])
-                a = int(parts[2])
-                b = int(parts[3])
-                G.add_edge(source, target, weight=b)
-                weights.append((source, target, (a, b)))
-        # print(weights)
-        return G, weights
+        network = read_traffic_network(file_name)
+        return network.to_networkx(), network
     # Throw error for when file is not found
     except FileNotFoundError:
         print(f"File '{file_name}' not found.")
-        return None
+        return None, None
     # Throw error for when the program can't read the graph from given file
     except Exception as e:
         print(f"Error reading graph from '{file_name}': {e}")
-        return None
+        return None, None
 
 
 # Write the graph to an external file in adjacency list format
@@ -94,8 +87,14 @@ def create_random_graph(n, c):
 
 
 # Find the shortest path between source and target nodes in graph G
-def shortest_path(G, source, target):
+# With a contraction hierarchy on the free-flow costs of the network the path is the fastest one under b
+def shortest_path(G, source, target, network=None, hierarchy=None):
     try:
+        if network is not None and hierarchy is not None and hierarchy.matches(network.b):
+            edges = hierarchy.shortest_path_edges(int(source), int(target))
+            if not edges:
+                return [int(source)]
+            return network.nodes[network.tail[edges]].tolist() + [int(network.nodes[network.head[edges[-1]]])]
         # Compute the shortest path
         path = nx.shortest_path(G, source=int(source), target=int(target))
         return path
@@ -113,16 +112,57 @@ def shortest_path(G, source, target):
         return None
 
 
+# Load the contraction hierarchy saved next to the network file for these costs, or build and save it
+# Free-flow costs b serve shortest paths, single driver latencies a + b the equilibrium route
+def build_hierarchy(network, file_name, single_driver=False):
+    try:
+        costs = network.latency(1) if single_driver else network.b
+        index_file = index_name(file_name, 'ab' if single_driver else 'b')
+        hierarchy = ContractionHierarchy.load(network, index_file, costs)
+        if hierarchy is None:
+            hierarchy = ContractionHierarchy.build(network, costs)
+            hierarchy.save(index_file)
+            print(f"Contraction hierarchy built with {len(hierarchy.shortcut_tail)} shortcuts.")
+        else:
+            print("Contraction hierarchy loaded.")
+        return hierarchy
+    except Exception as e:
+        print(f"Error building contraction hierarchy: {e}")
+        return None
+
+
+# Edge of highest (unnormalized) betweenness within the component nodes and its value, None without edges
+def _top_betweenness(G, nodes):
+    # A copy of the component, betweenness over a subgraph view is several times slower
+    betweenness = nx.edge_betweenness_centrality(G.subgraph(nodes).copy(), normalized=False)
+    if not betweenness:
+        return None
+    edge = max(betweenness, key=betweenness.get)
+    return edge, betweenness[edge]
+
+
+# Girvan-Newman: remove the edge of highest betweenness until G has num_components components
+# Removing an edge only changes betweenness inside its own component, so the betweenness is cached per component
+# and only the component that lost the edge is recomputed. Unnormalized values keep components comparable
 def partition_graph(G, num_components):
     try:
-        # cur_num_connected = nx.number_connected_components(G)
-        # print(f"Graph has initially {cur_num_connected} connected components.")
         edges_removed = 0
-        while nx.number_weakly_connected_components(G) < num_components:
-            edge_betweenness = nx.edge_betweenness_centrality(G)
-            max_betweenness_edge = max(edge_betweenness, key=edge_betweenness.get)
-            G.remove_edge(*max_betweenness_edge)
+        components = [set(nodes) for nodes in nx.weakly_connected_components(G)]
+        # Edge of highest betweenness and its value in every component (None when it has no edges)
+        tops = [_top_betweenness(G, nodes) for nodes in components]
+        while len(components) < num_components:
+            candidates = [i for i, top in enumerate(tops) if top is not None]
+            if not candidates:
+                raise ValueError(f"No edges left, the graph has only {len(components)} components.")
+            i = max(candidates, key=lambda k: tops[k][1])
+            edge = tops[i][0]
+            G.remove_edge(*edge)
             edges_removed += 1
+            # The component either stays whole or splits in two, both parts get fresh betweenness
+            parts = [set(nodes) for nodes in nx.weakly_connected_components(G.subgraph(components.pop(i)))]
+            tops.pop(i)
+            components += parts
+            tops += [_top_betweenness(G, nodes) for nodes in parts]
 
         print(f"Removed {edges_removed} edges")
         print(f"Graph partitioned into {num_components} components.")
@@ -132,27 +172,28 @@ def partition_graph(G, num_components):
         return None
 
 
-def find_equilibrium(G, n, source, destination, weights):
-    G = nx.DiGraph()
-    for edge in weights:
-        u, v, weight = edge
-        G.add_edge(u, v, weight=weight)
-
-    all_shortest_paths = dict(nx.all_pairs_dijkstra_path(G))
+# Uses the arrays loaded by read_weighted_digraph instead of rebuilding a graph on every call
+# The all-or-nothing route uses the contraction hierarchy when it was built on the single driver latencies
+def find_equilibrium(G, n, source, destination, network, hierarchy=None):
+    social_optimum = int((network.a + network.b).sum()) * n
 
-    social_optimum = sum([(edge[1][0] + edge[1][1]) for edge in nx.get_edge_attributes(G, 'weight').items()]) * n
-
-    shortest_paths = all_shortest_paths[source][destination]
-    nash_equilibrium = sum([(edge[2][0]) for edge in G.subgraph(shortest_paths).edges(data='weight')])
+    # Route over the latency each edge has for a single driver
+    path = network.shortest_path_edges(source, destination, network.latency(1), hierarchy)
+    path_nodes = np.unique(np.concatenate((network.tail[path], network.head[path]))) if path else \
+        np.array([network.node_id(source)])
+    # Edges between the nodes on the path
+    on_path = np.isin(network.tail, path_nodes) & np.isin(network.head, path_nodes)
+    nash_equilibrium = int(network.a[on_path].sum())
 
     return social_optimum, nash_equilibrium
 
 
-def plot_digraph(G, weights):
+def plot_digraph(G, network):
+    G = network.to_networkx()
     pos = nx.spring_layout(G)
     nx.draw(G, pos, with_labels=True, node_size=700, node_color='lightblue', font_size=12, font_color='black')
 
-    labels = {(u, v): f"{w[0]}x + {w[1]}" for u, v, w in weights}
+    labels = network.edge_labels()
 
     nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
     plt.title("Directed Graph Visualization")
@@ -264,7 +305,9 @@ def main():
     plot_shortest_path = False
     plot_cluster_coefficient = False
     plot_neighborhood_overlap = False
-    weights = None
+    network = None
+    network_file = None
+    hierarchy = None
     # Loop until the user chose 'x' to exit
     while True:
         print("Menu:")
@@ -297,7 +340,9 @@ def main():
         elif choice == "2":
             try:
                 file_name = input("Enter file name: ")
-                graph, weights = read_weighted_digraph(file_name)
+                graph, network = read_weighted_digraph(file_name)
+                network_file = file_name
+                hierarchy = None
                 # Check if the graph exist
                 if graph is None:
                     print("Error: Unable to read graph from file.")
@@ -359,7 +404,8 @@ def main():
             print("A. Shortest-Path")
             print("B. Partition G")
             print("C. Travel Equilibrium and Social Optimality")
-            sub = input("Enter your choice (a/b/c): ")
+            print("D. Contraction Hierarchy")
+            sub = input("Enter your choice (a/b/c/d): ")
 
             if sub.lower() == "a":
                 try:
@@ -367,7 +413,7 @@ def main():
                         raise ValueError("Graph is not defined.")
                     source = input("Enter source node: ")
                     target = input("Enter target node: ")
-                    shortest = shortest_path(graph, source, target)
+                    shortest = shortest_path(graph, source, target, network, hierarchy)
                     if shortest is None:
                         print("Error: No shortest path found.")
                     else:
@@ -396,12 +442,24 @@ def main():
                     n = int(input("Enter number of drivers: "))
                     source = int(input("Enter the initial node: "))
                     destination = int(input("Enter the destination node: "))
-                    social_optimum, nash_equilibrium = find_equilibrium(graph, n, source, destination, weights)
+                    social_optimum, nash_equilibrium = find_equilibrium(graph, n, source, destination, network,
+                                                                     hierarchy)
                     print(social_optimum, nash_equilibrium)
                 except ValueError as e:
                     print(f"Error: {e}")
                 except Exception as e:
                     print(f"Error: {e}")
+
+            elif sub.lower() == "d":
+                try:
+                    if network is None:
+                        raise ValueError("Digraph is not defined.")
+                    costs = input("Costs: free-flow b or single driver a + b? (b/ab): ")
+                    hierarchy = build_hierarchy(network, network_file, single_driver=costs.lower() == "ab")
+                except ValueError as e:
+                    print(f"Error: {e}")
+                except Exception as e:
+                    print(f"Error: {e}")
             else:
                 print("Invalid choice. Please try again.")
 
@@ -440,7 +498,7 @@ def main():
                 # Check if graph and shortest path is defined yet
                 if 'graph' not in locals() or 'shortest' not in locals():
                     raise ValueError("Graph or shortest path is not defined.")
-                plot_digraph(graph, weights)
+                plot_digraph(graph, network)
                 # plot_graph(graph, karate, shortest, plot_shortest_path, plot_cluster_coefficient,
                 #            plot_neighborhood_overlap)
                 print("Graph plotted.")
@@ -0,0 +1,23 @@
+import networkx as nx
+from traffic_network import read_traffic_network
+
+
+# (u, v, a, b) of every edge of a network, by node number
+def _edges(network):
+    return sorted(zip(network.nodes[network.tail].tolist(), network.nodes[network.head].tolist(),
+                      network.a.tolist(), network.b.tolist()))
+
+
+def test_parallel_edges_are_merged(tmp_path):
+    file_name = tmp_path / 'network.g'
+    file_name.write_text('1 2 1 5\n2 3 2 1\n1 2 3 7\n3 1 1 1\n2 3 4 2\n')
+    network = read_traffic_network(str(file_name))
+    assert network.number_of_edges() == 3
+    # The last row of a repeated edge wins, as in a networkx DiGraph
+    assert _edges(network) == [(1, 2, 3, 7), (2, 3, 4, 2), (3, 1, 1, 1)]
+    G = nx.DiGraph()
+    for line in file_name.read_text().splitlines():
+        u, v, a, b = map(int, line.split())
+        G.add_edge(u, v, weight=b)
+    assert sorted(G.edges(data='weight')) == [(u, v, b) for u, v, a, b in _edges(network)]
+
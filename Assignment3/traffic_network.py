@@ -0,0 +1,99 @@
+import heapq
+import numpy as np
+import networkx as nx
+
+
+# Traffic network kept as struct-of-arrays: edge k goes from tail[k] to head[k] with latency a[k] * x + b[k].
+# Nodes are stored as dense ids 0..n-1, nodes[u] is the node number used in the file.
+# The out-edges of node u are order[indptr[u]:indptr[u + 1]] (edge ids sorted by tail).
+class TrafficNetwork:
+    def __init__(self, nodes, tail, head, a, b):
+        self.nodes = nodes
+        self.tail = tail
+        self.head = head
+        self.a = a
+        self.b = b
+        self.order = np.argsort(tail, kind='stable')
+        self.indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tail, minlength=len(nodes)), out=self.indptr[1:])
+        self._graph = None
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        return len(self.tail)
+
+    # Dense id of a node number from the file
+    def node_id(self, node):
+        u = int(np.searchsorted(self.nodes, node))
+        if u == len(self.nodes) or self.nodes[u] != node:
+            raise nx.NodeNotFound(f"Node {node} not found in the graph.")
+        return u
+
+    # Latency of every edge when x drivers use it
+    def latency(self, x=1):
+        return self.a * x + self.b
+
+    # Dijkstra over the CSR adjacency with the given per-edge costs, returns the list of edge ids on the path
+    # A contraction hierarchy built on the same costs answers the query instead when given
+    def shortest_path_edges(self, source, target, costs, hierarchy=None):
+        if hierarchy is not None and hierarchy.matches(costs):
+            return hierarchy.shortest_path_edges(source, target)
+        source, target = self.node_id(source), self.node_id(target)
+        dist = np.full(self.number_of_nodes(), np.inf)
+        via = np.full(self.number_of_nodes(), -1, dtype=np.int64)
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u == target:
+                break
+            if d > dist[u]:
+                continue
+            for k in self.order[self.indptr[u]:self.indptr[u + 1]]:
+                v = self.head[k]
+                if d + costs[k] < dist[v]:
+                    dist[v] = d + costs[k]
+                    via[v] = k
+                    heapq.heappush(heap, (dist[v], v))
+        if source != target and via[target] < 0:
+            raise nx.NetworkXNoPath(f"No path found from {self.nodes[source]} to {self.nodes[target]}.")
+        edges = []
+        u = target
+        while u != source:
+            edges.append(int(via[u]))
+            u = self.tail[via[u]]
+        return edges[::-1]
+
+    # networkx view of the network (weight b, as read_weighted_digraph always used), built once
+    def to_networkx(self):
+        if self._graph is None:
+            G = nx.DiGraph()
+            G.add_nodes_from(self.nodes.tolist())
+            G.add_weighted_edges_from(zip(self.nodes[self.tail].tolist(), self.nodes[self.head].tolist(),
+                                          self.b.tolist()))
+            self._graph = G
+        return self._graph
+
+    # Edge labels "ax + b" for plotting
+    def edge_labels(self):
+        return {(u, v): f"{a}x + {b}" for u, v, a, b in zip(self.nodes[self.tail].tolist(),
+                                                            self.nodes[self.head].tolist(),
+                                                            self.a.tolist(), self.b.tolist())}
+
+
+# Read "u v a b" rows into a TrafficNetwork
+# A repeated (u, v) row replaces the earlier one, as adding the same edge to a networkx DiGraph does
+def read_traffic_network(file_name):
+    rows = np.loadtxt(file_name, dtype=np.int64, ndmin=2, comments='#')
+    if rows.size == 0:
+        rows = rows.reshape(0, 4)
+    if rows.shape[1] != 4:
+        raise ValueError(f"Expected 4 columns (u v a b), found {rows.shape[1]}.")
+    nodes, ends = np.unique(rows[:, :2], return_inverse=True)
+    ends = ends.reshape(-1, 2)
+    # Last row of every (u, v) pair, kept in file order
+    keys = ends[::-1, 0] * len(nodes) + ends[::-1, 1]
+    last = np.sort(len(keys) - 1 - np.unique(keys, return_index=True)[1])
+    return TrafficNetwork(nodes, ends[last, 0], ends[last, 1], rows[last, 2], rows[last, 3])
@@ -1,3 +1,4 @@
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 from collections import defaultdict
@@ -6,8 +7,11 @@ from collections import defaultdict
 def read_data(file_path):
     with open(file_path, 'r') as file:
         n = int(file.readline().strip())
-        prices = list(map(int, file.readline().strip().split(',')))
-        valuations = [list(map(int, line.strip().split(','))) for line in file]
+        prices = np.array(file.readline().strip().split(','), dtype=np.int64)
+        # Parse the valuations straight into an n x n matrix instead of nested lists
+        valuations = np.loadtxt(file, delimiter=',', dtype=np.int64, ndmin=2)
+    if valuations.size and np.abs(valuations).max() <= np.iinfo(np.int32).max:
+        valuations = valuations.astype(np.int32)
     print(n)
     print(prices)
     print(valuations)
@@ -74,7 +78,8 @@ def preferred_seller_market_clearing(num_houses, house_prices, buyer_valuations)
 
         for buyer, house in buyer_to_preferred_seller.items():
             if house is not None and house not in matched_houses:
-                assignments[buyer] = {'house': house, 'payoff': buyer_valuations[buyer][house] - house_prices[house]}
+                payoff = int(buyer_valuations[buyer][house] - house_prices[house])
+                assignments[buyer] = {'house': house, 'payoff': payoff}
                 remaining_houses.remove(house)
                 remaining_buyers.remove(buyer)
                 matched_houses.add(house)
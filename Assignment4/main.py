@@ -124,17 +124,16 @@ def create_bipartite_graph(n, m, p):
 
 # Market clearing with the given file format.
 def market_clearing(filename):
-    valuations = []
     with open(filename, 'r') as file:
         # Parse file contents
         line = file.readline()
         n = int(line.strip().split(" ")[0])
-        prices = list(map(int, line.strip().split(" ")[1].split(",")))
+        prices = np.array(line.strip().split(" ")[1].split(","), dtype=np.int64)
 
-        lines = file.readlines()
-        for line in lines:
-            values = list(map(int, line.strip().split(',')))
-            valuations.append(values)
+        # Parse the valuations straight into an n x n matrix instead of nested lists
+        valuations = np.loadtxt(file, delimiter=',', dtype=np.int64, ndmin=2)
+    if valuations.size and np.abs(valuations).max() <= np.iinfo(np.int32).max:
+        valuations = valuations.astype(np.int32)
     # Print the parsed data (optional)
     # print(n)
     # print(prices)
@@ -162,16 +161,38 @@ def shortest_path(G, source, target):
         return None
 
 
+# Edge of highest (unnormalized) betweenness within the component nodes and its value, None without edges
+def _top_betweenness(G, nodes):
+    # A copy of the component, betweenness over a subgraph view is several times slower
+    betweenness = nx.edge_betweenness_centrality(G.subgraph(nodes).copy(), normalized=False)
+    if not betweenness:
+        return None
+    edge = max(betweenness, key=betweenness.get)
+    return edge, betweenness[edge]
+
+
+# Girvan-Newman: remove the edge of highest betweenness until G has num_components components
+# Removing an edge only changes betweenness inside its own component, so the betweenness is cached per component
+# and only the component that lost the edge is recomputed. Unnormalized values keep components comparable
 def partition_graph(G, num_components):
     try:
-        # cur_num_connected = nx.number_connected_components(G)
-        # print(f"Graph has initially {cur_num_connected} connected components.")
         edges_removed = 0
-        while nx.number_connected_components(G) < num_components:
-            edge_betweenness = nx.edge_betweenness_centrality(G)
-            max_betweenness_edge = max(edge_betweenness, key=edge_betweenness.get)
-            G.remove_edge(*max_betweenness_edge)
+        components = [set(nodes) for nodes in nx.connected_components(G)]
+        # Edge of highest betweenness and its value in every component (None when it has no edges)
+        tops = [_top_betweenness(G, nodes) for nodes in components]
+        while len(components) < num_components:
+            candidates = [i for i, top in enumerate(tops) if top is not None]
+            if not candidates:
+                raise ValueError(f"No edges left, the graph has only {len(components)} components.")
+            i = max(candidates, key=lambda k: tops[k][1])
+            edge = tops[i][0]
+            G.remove_edge(*edge)
             edges_removed += 1
+            # The component either stays whole or splits in two, both parts get fresh betweenness
+            parts = [set(nodes) for nodes in nx.connected_components(G.subgraph(components.pop(i)))]
+            tops.pop(i)
+            components += parts
+            tops += [_top_betweenness(G, nodes) for nodes in parts]
 
         print(f"Removed {edges_removed} edges")
         print(f"Graph partitioned into {num_components} components.")
@@ -182,14 +203,14 @@ def partition_graph(G, num_components):
 
 
 def find_equilibrium(G, n, source, destination):
-    # Calculate the shortest paths for all pairs of nodes
-    all_shortest_paths = dict(nx.all_pairs_dijkstra_path(G))
+    # Only the source -> destination path is needed, Dijkstra stops once the destination is settled
+    path = nx.dijkstra_path(G, source, destination)
 
     # Calculate the social optimum
-    social_optimum = sum([len(all_shortest_paths[source][destination]) - 1 for _ in range(n)])
+    social_optimum = (len(path) - 1) * n
 
     # Calculate the Nash equilibrium
-    nash_equilibrium = len(all_shortest_paths[source][destination]) - 1
+    nash_equilibrium = len(path) - 1
 
     return social_optimum, nash_equilibrium
 
@@ -257,7 +278,7 @@ def compute_preferred_seller(n, prices, valuations):
 
         for buyer, house in buyer_to_preferred_seller.items():
             if house is not None and house not in matched_houses:
-                assignments[buyer] = {'house': house+1, 'payoff': (valuations[buyer][house] - prices[house])}
+                assignments[buyer] = {'house': house+1, 'payoff': int(valuations[buyer][house] - prices[house])}
                 remaining_houses.remove(house)
                 remaining_buyers.remove(buyer)
                 matched_houses.add(house)
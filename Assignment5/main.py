@@ -163,16 +163,38 @@ def shortest_path(G, source, target):
         return None
 
 
+# Edge of highest (unnormalized) betweenness within the component nodes and its value, None without edges
+def _top_betweenness(G, nodes):
+    # A copy of the component, betweenness over a subgraph view is several times slower
+    betweenness = nx.edge_betweenness_centrality(G.subgraph(nodes).copy(), normalized=False)
+    if not betweenness:
+        return None
+    edge = max(betweenness, key=betweenness.get)
+    return edge, betweenness[edge]
+
+
+# Girvan-Newman: remove the edge of highest betweenness until G has num_components components
+# Removing an edge only changes betweenness inside its own component, so the betweenness is cached per component
+# and only the component that lost the edge is recomputed. Unnormalized values keep components comparable
 def partition_graph(G, num_components):
     try:
-        # cur_num_connected = nx.number_connected_components(G)
-        # print(f"Graph has initially {cur_num_connected} connected components.")
         edges_removed = 0
-        while nx.number_connected_components(G) < num_components:
-            edge_betweenness = nx.edge_betweenness_centrality(G)
-            max_betweenness_edge = max(edge_betweenness, key=edge_betweenness.get)
-            G.remove_edge(*max_betweenness_edge)
+        components = [set(nodes) for nodes in nx.connected_components(G)]
+        # Edge of highest betweenness and its value in every component (None when it has no edges)
+        tops = [_top_betweenness(G, nodes) for nodes in components]
+        while len(components) < num_components:
+            candidates = [i for i, top in enumerate(tops) if top is not None]
+            if not candidates:
+                raise ValueError(f"No edges left, the graph has only {len(components)} components.")
+            i = max(candidates, key=lambda k: tops[k][1])
+            edge = tops[i][0]
+            G.remove_edge(*edge)
             edges_removed += 1
+            # The component either stays whole or splits in two, both parts get fresh betweenness
+            parts = [set(nodes) for nodes in nx.connected_components(G.subgraph(components.pop(i)))]
+            tops.pop(i)
+            components += parts
+            tops += [_top_betweenness(G, nodes) for nodes in parts]
 
         print(f"Removed {edges_removed} edges")
         print(f"Graph partitioned into {num_components} components.")
@@ -183,14 +205,14 @@ def partition_graph(G, num_components):
 
 
 def find_equilibrium(G, n, source, destination):
-    # Calculate the shortest paths for all pairs of nodes
-    all_shortest_paths = dict(nx.all_pairs_dijkstra_path(G))
+    # Only the source -> destination path is needed, Dijkstra stops once the destination is settled
+    path = nx.dijkstra_path(G, source, destination)
 
     # Calculate the social optimum
-    social_optimum = sum([len(all_shortest_paths[source][destination]) - 1 for _ in range(n)])
+    social_optimum = (len(path) - 1) * n
 
     # Calculate the Nash equilibrium
-    nash_equilibrium = len(all_shortest_paths[source][destination]) - 1
+    nash_equilibrium = len(path) - 1
 
     return social_optimum, nash_equilibrium
 
@@ -0,0 +1,130 @@
+import os
+import argparse
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import binary_graph
+import graph_delta
+import parallel_parse
+import shortest_paths
+from csr_graph import read_graph_csr
+
+# Queries answered by one worker task; the queries of one source always stay in the same task
+TASK_QUERIES = 256
+
+# Graph of a worker process, memory-mapped once by the pool initializer
+_graph = None
+
+
+# Read "source target" lines into {source: [targets]}, keeping the file order of the sources
+def read_queries(file_name):
+    groups = OrderedDict()
+    with open(file_name, 'r') as file:
+        for line in file:
+            parts = line.split('#')[0].split()
+            if len(parts) >= 2:
+                groups.setdefault(parts[0], []).append(parts[1])
+    return groups
+
+
+# Split the source groups into tasks of about TASK_QUERIES queries
+def make_tasks(groups, task_queries=TASK_QUERIES):
+    tasks, task, size = [], [], 0
+    for source, targets in groups.items():
+        task.append((source, targets))
+        size += len(targets)
+        if size >= task_queries:
+            tasks.append(task)
+            task, size = [], 0
+    if task:
+        tasks.append(task)
+    return tasks
+
+
+def _attach(graph_file):
+    global _graph
+    _graph = binary_graph.read_binary_graph(graph_file)
+
+
+# Answer the queries of a task with one search per source that stops once all of its targets are settled
+# Result lines: "source target length path..." ("inf" when unreachable, "missing" for unknown nodes)
+def answer_task(task, G=None):
+    G = _graph if G is None else G
+    lines = []
+    for source, targets in task:
+        try:
+            root = G.node_id(source)
+        except KeyError:
+            lines += [f"{source} {target} missing\n" for target in targets]
+            continue
+        ids = {}
+        for target in targets:
+            try:
+                ids[target] = G.node_id(target)
+            except KeyError:
+                ids[target] = None
+        parent = shortest_paths.single_source_tree(G, root, [u for u in ids.values() if u is not None])
+        for target in targets:
+            if ids[target] is None:
+                lines.append(f"{source} {target} missing\n")
+                continue
+            path = shortest_paths.tree_path(parent, ids[target])
+            if path is None:
+                lines.append(f"{source} {target} inf\n")
+            else:
+                length = shortest_paths.path_length(G, path)
+                lines.append(f"{source} {target} {length} {' '.join(G.label(u) for u in path)}\n")
+    return lines
+
+
+# Answer every query in query_file on the graph and stream the results to output_file as tasks finish
+# Workers memory-map the binary graph instead of receiving a pickled copy; graphs that are not binary
+# graph files (adjacency lists, or weighted edge lists with weighted=True), snapshots with edits in their
+# change log and in-memory graphs are written to a temporary binary file first
+def run_batch(graph, query_file, output_file, workers=None, weighted=False):
+    groups = read_queries(query_file)
+    tasks = make_tasks(groups)
+    temp_dir = None
+    try:
+        if isinstance(graph, str) and binary_graph.is_binary_graph(graph) and not graph_delta.has_edits(graph):
+            graph_file = graph
+        else:
+            if isinstance(graph, str) and binary_graph.is_binary_graph(graph):
+                # The workers would only see the snapshot, so the logged edits are applied here
+                graph = graph_delta.read_delta_graph(graph)
+            elif isinstance(graph, str):
+                graph = parallel_parse.read_weighted_digraph_csr(graph) if weighted else read_graph_csr(graph)
+            temp_dir = tempfile.mkdtemp()
+            graph_file = os.path.join(temp_dir, 'graph' + binary_graph.EXTENSION)
+            binary_graph.write_binary_graph(graph, graph_file)
+        answered = 0
+        with open(output_file, 'w') as output, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(graph_file,)) as executor:
+            futures = [executor.submit(answer_task, task) for task in tasks]
+            for future in as_completed(futures):
+                lines = future.result()
+                output.writelines(lines)
+                output.flush()
+                answered += len(lines)
+        return answered
+    finally:
+        if temp_dir is not None:
+            for name in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of shortest-path queries in parallel.")
+    parser.add_argument('graph', help="graph file (binary graph files are memory-mapped directly)")
+    parser.add_argument('queries', help="file with one 'source target' query per line")
+    parser.add_argument('output', help="result file, one 'source target length path...' line per query")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--weighted', action='store_true', help="read a text graph as a weighted edge list")
+    args = parser.parse_args()
+    answered = run_batch(args.graph, args.queries, args.output, args.workers, args.weighted)
+    print(f"Answered {answered} queries into '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import struct
+import numpy as np
+from csr_graph import CSRGraph, from_networkx
+from node_labels import LabelTable
+
+# Binary graph container:
+#   64 byte header (magic, version, flags, n, m, label bytes)
+#   indptr int64[n + 1], indices int32/int64[m], weights float64[m] (optional),
+#   label offsets int64[n + 1], label buffer (utf-8), label order int64[n] (optional, version 2)
+# indptr is the node -> position index of the neighbor blocks, each block is sorted by neighbor id.
+# Every section starts on an 8 byte boundary so it can be memory-mapped in place.
+MAGIC = b'CECSCSR\x00'
+VERSION = 2
+HEADER = struct.Struct('<8sIIQQQ24x')
+FLAG_DIRECTED = 1
+FLAG_WEIGHTED = 2
+FLAG_WIDE_INDICES = 4
+FLAG_LABEL_ORDER = 8
+EXTENSION = '.csrg'
+
+
+# Check whether a file starts with the binary graph magic bytes
+def is_binary_graph(file_name):
+    with open(file_name, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _padding(position):
+    return -position % 8
+
+
+# Write a CSR graph (or a networkx graph, converted first) to the binary container
+def write_binary_graph(G, file_name):
+    if not isinstance(G, CSRGraph):
+        G = from_networkx(G)
+    labels = G.labels
+    n, m = G.number_of_nodes(), len(G.indices)
+    wide = G.indices.dtype == np.int64
+    flags = (FLAG_DIRECTED if G.directed else 0) | (FLAG_WEIGHTED if G.weights is not None else 0) \
+        | (FLAG_WIDE_INDICES if wide else 0) | FLAG_LABEL_ORDER
+    sections = [
+        np.ascontiguousarray(G.indptr, dtype=np.int64),
+        np.ascontiguousarray(G.indices, dtype=np.int64 if wide else np.int32),
+    ]
+    if G.weights is not None:
+        sections.append(np.ascontiguousarray(G.weights, dtype=np.float64))
+    sections.append(np.ascontiguousarray(labels.offsets, dtype=np.int64))
+    sections.append(np.ascontiguousarray(labels.buffer, dtype=np.uint8))
+    # Sorted label order, so label lookups on an opened file need no index build
+    sections.append(np.ascontiguousarray(labels.sorted_order(), dtype=np.int64))
+    with open(file_name, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, n, m, len(labels.buffer)))
+        for section in sections:
+            # tofile streams the array without building an intermediate bytes object
+            section.tofile(file)
+            file.write(b'\x00' * _padding(section.nbytes))
+
+
+# Read the header of a binary graph and return (flags, n, m, {section name: (offset, dtype, count)})
+def read_layout(file_name):
+    with open(file_name, 'rb') as file:
+        magic, version, flags, n, m, label_bytes = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"'{file_name}' is not a binary graph file.")
+    if version > VERSION:
+        raise ValueError(f"Binary graph version {version} is not supported.")
+    sections = [('indptr', np.int64, n + 1), ('indices', np.int64 if flags & FLAG_WIDE_INDICES else np.int32, m)]
+    if flags & FLAG_WEIGHTED:
+        sections.append(('weights', np.float64, m))
+    sections += [('offsets', np.int64, n + 1), ('buffer', np.uint8, label_bytes)]
+    if flags & FLAG_LABEL_ORDER:
+        sections.append(('order', np.int64, n))
+    layout = {}
+    position = HEADER.size
+    for name, dtype, count in sections:
+        layout[name] = (position, np.dtype(dtype), count)
+        position += count * np.dtype(dtype).itemsize
+        position += _padding(position)
+    return flags, n, m, layout
+
+
+# Memory-map one section of a binary graph
+def map_section(file_name, layout, name, mode='r'):
+    if name not in layout:
+        return None
+    offset, dtype, count = layout[name]
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(file_name, dtype=dtype, mode=mode, offset=offset, shape=(count,))
+
+
+# Open a binary graph with numpy.memmap; nothing is read until the arrays are used
+def read_binary_graph(file_name, mode='r'):
+    flags, n, m, layout = read_layout(file_name)
+    sections = {name: map_section(file_name, layout, name, mode) for name in layout}
+    labels = LabelTable(sections['offsets'], sections['buffer'], sections.get('order'))
+    return CSRGraph(sections['indptr'], sections['indices'], labels, sections.get('weights'),
+                    bool(flags & FLAG_DIRECTED))
@@ -0,0 +1,97 @@
+import io
+import bz2
+import gzip
+import lzma
+import queue
+import threading
+
+# Magic bytes of the supported compression formats
+MAGIC_BYTES = [
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+]
+# Size of the decompressed blocks passed from the background thread to the parser
+BLOCK_BYTES = 1024 * 1024
+# Number of decompressed blocks that may wait in the buffer
+QUEUE_BLOCKS = 16
+
+
+# Return the function that opens the file's compression format, or None for plain files
+def detect_compression(file_name):
+    with open(file_name, 'rb') as file:
+        head = file.read(6)
+    for magic, opener in MAGIC_BYTES:
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+# Raw stream fed by a thread that decompresses the file into a bounded queue,
+# so decompression of the next blocks overlaps with parsing of the current one
+class _DecompressingReader(io.RawIOBase):
+    def __init__(self, file_name, opener):
+        self._blocks = queue.Queue(maxsize=QUEUE_BLOCKS)
+        self._stop = threading.Event()
+        self._pending = b''
+        self._done = False
+        self._thread = threading.Thread(target=self._decompress, args=(file_name, opener), daemon=True)
+        self._thread.start()
+
+    def _decompress(self, file_name, opener):
+        try:
+            with opener(file_name, 'rb') as file:
+                while not self._stop.is_set():
+                    block = file.read(BLOCK_BYTES)
+                    if not block:
+                        break
+                    self._put(block)
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        # Give up when the reader has been closed instead of blocking forever on a full queue
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending and not self._done:
+            item = self._blocks.get()
+            if item is None:
+                self._done = True
+            elif isinstance(item, Exception):
+                self._done = True
+                raise item
+            else:
+                self._pending = memoryview(item)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        self._stop.set()
+        super().close()
+
+
+# Open a possibly compressed file for reading bytes
+def open_binary(file_name):
+    opener = detect_compression(file_name)
+    if opener is None:
+        return open(file_name, 'rb')
+    return io.BufferedReader(_DecompressingReader(file_name, opener), buffer_size=BLOCK_BYTES)
+
+
+# Open a possibly compressed file for reading text
+def open_text(file_name):
+    if detect_compression(file_name) is None:
+        return open(file_name, 'r')
+    return io.TextIOWrapper(open_binary(file_name))
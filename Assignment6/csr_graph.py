@@ -0,0 +1,249 @@
+import array
+import numpy as np
+import networkx as nx
+from compressed_io import open_text
+from node_labels import LabelTable
+
+# Files at least this large are loaded into a CSR graph instead of a networkx graph
+CSR_THRESHOLD_BYTES = 64 * 1024 * 1024
+# Largest CSR graph (in stored adjacency entries, undirected edges count twice) converted to networkx for the
+# algorithms that edit a graph in place; a networkx copy takes several hundred bytes per edge
+NETWORKX_MAX_ENTRIES = 1 << 22
+# Number of bytes of text handed to the parser at a time
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+# Compact graph stored as CSR arrays: the neighbors of node u are indices[indptr[u]:indptr[u + 1]]
+# Algorithms work on dense node ids; labels are only used when reading input and printing results
+class CSRGraph:
+    def __init__(self, indptr, indices, labels, weights=None, directed=False):
+        self.indptr = indptr
+        self.indices = indices
+        self.labels = labels if isinstance(labels, LabelTable) else LabelTable.from_labels(labels)
+        self.weights = weights
+        self.directed = directed
+        # Graph attributes like networkx's G.graph, e.g. the snapshot file the graph was read from
+        self.graph = {}
+        self._reverse = None
+
+    def is_directed(self):
+        return self.directed
+
+    def number_of_nodes(self):
+        return len(self.indptr) - 1
+
+    def number_of_edges(self):
+        m = len(self.indices)
+        if self.directed:
+            return m
+        # Undirected edges are stored in both directions, self-loops only once
+        rows = np.repeat(np.arange(self.number_of_nodes()), np.diff(self.indptr))
+        loops = int(np.count_nonzero(rows == self.indices))
+        return (m + loops) // 2
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    # Neighbors of the dense node id u
+    def neighbors(self, u):
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    # Out-degree (degree for undirected graphs) of every node
+    def degree(self):
+        return np.diff(self.indptr)
+
+    # In-degree of every node
+    def in_degree(self):
+        if not self.directed:
+            return self.degree()
+        return np.bincount(self.indices, minlength=self.number_of_nodes())
+
+    def label(self, u):
+        return self.labels[u]
+
+    # Graph with every edge reversed (the graph itself when undirected), built once
+    def reverse(self):
+        if not self.directed:
+            return self
+        if self._reverse is None:
+            n = self.number_of_nodes()
+            rows = np.repeat(np.arange(n, dtype=self.indices.dtype), np.diff(self.indptr))
+            # A stable sort by target keeps every reversed row sorted by source
+            order = np.argsort(self.indices, kind='stable')
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=n), out=indptr[1:])
+            weights = None if self.weights is None else np.asarray(self.weights)[order]
+            self._reverse = CSRGraph(indptr, rows[order], self.labels, weights, True)
+            self._reverse._reverse = self
+        return self._reverse
+
+    # Dense node id for a label, raises KeyError when the node does not exist
+    def node_id(self, label):
+        return self.labels.node_id(label)
+
+    # Build a networkx graph, optionally restricted to the given node ids (used for plotting)
+    # Labels are decoded once and the edges added in bulk from the CSR arrays
+    def to_networkx(self, nodes=None):
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        if nodes is None:
+            nodes = range(self.number_of_nodes())
+        nodes = np.asarray(nodes, dtype=np.int64)
+        keep = np.zeros(self.number_of_nodes(), dtype=bool)
+        keep[nodes] = True
+        labels = list(self.labels)
+        G.add_nodes_from(labels[u] for u in nodes.tolist())
+        indptr = np.asarray(self.indptr, dtype=np.int64)
+        counts = indptr[nodes + 1] - indptr[nodes]
+        # Edge positions of the nodes, node after node in the given order
+        edges = np.repeat(indptr[nodes] - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+        src = np.repeat(nodes, counts)
+        dst = np.asarray(self.indices)[edges]
+        inside = keep[dst]
+        if not self.directed:
+            # Undirected edges are stored both ways, networkx only needs one of them
+            inside &= src <= dst
+        ends = zip(map(labels.__getitem__, src[inside].tolist()), map(labels.__getitem__, dst[inside].tolist()))
+        if self.weights is None:
+            G.add_edges_from(ends)
+        else:
+            weights = np.asarray(self.weights, dtype=np.float64)[edges[inside]].tolist()
+            G.add_weighted_edges_from((u, v, w) for (u, v), w in zip(ends, weights))
+        return G
+
+
+# Build CSR arrays from edge arrays; duplicate edges are merged and undirected edges are stored both ways
+def build_csr(src, dst, n, directed=False, weights=None):
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if not directed:
+        src, dst = np.concatenate((src, dst)), np.concatenate((dst, src))
+        if weights is not None:
+            weights = np.concatenate((weights, weights))
+    keys = src * n + dst
+    # Sort and mask instead of np.unique, which is much slower on large arrays
+    if weights is None:
+        keys = np.sort(keys)
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = keys[1:] != keys[:-1]
+    else:
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        weights = np.asarray(weights, dtype=np.float64)[order]
+        # Later edges overwrite earlier ones, like repeated G.add_edge calls
+        keep = np.ones(len(keys), dtype=bool)
+        keep[:-1] = keys[1:] != keys[:-1]
+        weights = weights[keep]
+    keys = keys[keep]
+    rows = keys // n
+    indices = (keys % n).astype(np.int32 if n < 2 ** 31 else np.int64)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, indices, weights
+
+
+# Convert a networkx graph into a CSR graph
+def from_networkx(G):
+    labels = list(G.nodes())
+    ids = {node: u for u, node in enumerate(labels)}
+    src = np.fromiter((ids[u] for u, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    dst = np.fromiter((ids[v] for u, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    weights = None
+    if G.number_of_edges() and all(isinstance(w, (int, float)) for _, _, w in G.edges(data='weight')):
+        weights = np.fromiter((w for _, _, w in G.edges(data='weight')), dtype=np.float64)
+    indptr, indices, weights = build_csr(src, dst, len(labels), G.is_directed(), weights)
+    return CSRGraph(indptr, indices, labels, weights, G.is_directed())
+
+
+# Parse the adjacency lists in a block of lines into edge id arrays, interning new labels as they appear
+def _parse_adjacency_lines(lines, ids, labels):
+    src = array.array('q')
+    dst = array.array('q')
+    for line in lines:
+        # Remove comments and whitespace
+        nodes = line.split('#')[0].split()
+        if len(nodes) < 2:
+            continue
+        ends = []
+        for node in nodes:
+            u = ids.get(node)
+            if u is None:
+                u = ids[node] = len(labels)
+                labels.append(node)
+            ends.append(u)
+        source = ends[0]
+        for target in ends[1:]:
+            src.append(source)
+            dst.append(target)
+    return np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64)
+
+
+# Stream a graph in adjacency list format straight into CSR arrays, one chunk of lines at a time
+def read_graph_csr(file_name, chunk_bytes=CHUNK_BYTES):
+    ids = {}
+    labels = []
+    src_chunks = []
+    dst_chunks = []
+    with open_text(file_name) as file:
+        while True:
+            lines = file.readlines(chunk_bytes)
+            if not lines:
+                break
+            src, dst = _parse_adjacency_lines(lines, ids, labels)
+            src_chunks.append(src)
+            dst_chunks.append(dst)
+    # The label dictionary is only needed while parsing, afterwards the labels are interned into one buffer
+    del ids
+    labels = LabelTable.from_labels(labels)
+    src = np.concatenate(src_chunks) if src_chunks else np.empty(0, dtype=np.int64)
+    dst = np.concatenate(dst_chunks) if dst_chunks else np.empty(0, dtype=np.int64)
+    indptr, indices, _ = build_csr(src, dst, len(labels))
+    return CSRGraph(indptr, indices, labels)
+
+
+# Breadth-first search from source to target over dense ids, returns the list of ids on the path or None
+def bfs_path(G, source, target):
+    n = G.number_of_nodes()
+    parent = np.full(n, -1, dtype=np.int64)
+    parent[source] = source
+    frontier = np.array([source], dtype=np.int64)
+    indptr, indices = G.indptr, G.indices
+    while len(frontier) and parent[target] < 0:
+        # Expand the whole frontier at once
+        starts, ends = indptr[frontier], indptr[frontier + 1]
+        counts = ends - starts
+        owners = np.repeat(frontier, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = indices[np.repeat(starts, counts) + offsets]
+        new = parent[candidates] < 0
+        candidates, owners = candidates[new], owners[new]
+        # Keep the first parent found for every newly reached node
+        candidates, first = np.unique(candidates, return_index=True)
+        parent[candidates] = owners[first]
+        frontier = candidates
+    if parent[target] < 0:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(int(parent[path[-1]]))
+    return path[::-1]
+
+
+# PageRank by power iteration on the CSR arrays, same conventions as nx.pagerank (dangling nodes spread uniformly)
+def pagerank(G, alpha=0.85, max_iter=100, tol=1.0e-06):
+    n = G.number_of_nodes()
+    if n == 0:
+        return np.empty(0)
+    rows = np.repeat(np.arange(n), np.diff(G.indptr))
+    weights = G.weights if G.weights is not None else np.ones(len(G.indices))
+    out_weight = np.bincount(rows, weights=weights, minlength=n)
+    dangling = out_weight == 0
+    share = np.divide(weights, out_weight[rows], out=np.zeros(len(weights)), where=out_weight[rows] > 0)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = rank
+        rank = alpha * np.bincount(G.indices, weights=previous[rows] * share, minlength=n)
+        rank += (alpha * previous[dangling].sum() + (1 - alpha)) / n
+        if np.abs(rank - previous).sum() < n * tol:
+            return rank
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
@@ -0,0 +1,109 @@
+import numpy as np
+
+# 64-bit words per node in a bitset search, every word carries the frontier of 64 sources
+WORDS = 1
+# Upper bound on the frontier edges expanded at a time (each one copies the frontier words of its tail)
+EDGE_BLOCK = 1 << 22
+# Rows of a bitset unpacked at a time when counting the nodes each source reached
+COUNT_ROWS = 1 << 16
+# z value of the 95% confidence intervals
+Z = 1.96
+
+
+# Number of set bits of every source column (bit j of word w is source 64 * w + j) over the given rows
+def _source_counts(bits, sources):
+    counts = np.zeros(bits.shape[1] * 64, dtype=np.int64)
+    for first in range(0, len(bits), COUNT_ROWS):
+        block = np.ascontiguousarray(bits[first:first + COUNT_ROWS]).astype('<u8', copy=False)
+        counts += np.unpackbits(block.view(np.uint8), axis=1, bitorder='little').sum(axis=0, dtype=np.int64)
+    return counts[:sources]
+
+
+# Nodes that any source in the frontier reaches along one more edge, as bitsets
+# Frontier nodes are expanded in blocks of about EDGE_BLOCK edges, every edge ORs its tail's words into its head
+def _expand(indptr, indices, frontier):
+    reached = np.zeros_like(frontier)
+    active = np.flatnonzero(frontier.any(axis=1))
+    degrees = indptr[active + 1] - indptr[active]
+    ends = np.cumsum(degrees)
+    first = 0
+    while first < len(active):
+        last = int(np.searchsorted(ends, (ends[first - 1] if first else 0) + EDGE_BLOCK, side='right'))
+        last = max(last, first + 1)
+        nodes, counts = active[first:last], degrees[first:last]
+        # Edge positions of the block's nodes, laid out node after node
+        offsets = np.cumsum(counts) - counts
+        edges = np.repeat(indptr[nodes] - offsets, counts) + np.arange(int(counts.sum()))
+        np.bitwise_or.at(reached, indices[edges], np.repeat(frontier[nodes], counts, axis=0))
+        first = last
+    return reached
+
+
+# Breadth-first search from up to 64 * words sources at once: every node holds one bit per source, set once
+# the source has reached it, and a level ORs the frontier bits along all frontier edges
+# Returns counts[d, s], the number of nodes at distance d from sources[s]
+def _bitset_counts(indptr, indices, n, sources, words):
+    bits = np.arange(len(sources))
+    visited = np.zeros((n, words), dtype=np.uint64)
+    visited[sources, bits // 64] |= np.uint64(1) << (bits % 64).astype(np.uint64)
+    frontier = visited.copy()
+    counts = [np.ones(len(sources), dtype=np.int64)]
+    while True:
+        frontier = _expand(indptr, indices, frontier)
+        frontier &= ~visited
+        rows = np.flatnonzero(frontier.any(axis=1))
+        if not len(rows):
+            break
+        visited |= frontier
+        counts.append(_source_counts(frontier[rows], len(sources)))
+    return np.array(counts)
+
+
+# counts[d, s], the number of nodes at distance d from sources[s] (dense ids) in a CSR graph, from bitset
+# searches over batches of 64 * words sources. Distances follow the edge direction of directed graphs
+def distance_counts(G, sources, words=WORDS):
+    indptr, indices = np.asarray(G.indptr, dtype=np.int64), np.asarray(G.indices, dtype=np.int64)
+    sources = np.asarray(sources, dtype=np.int64)
+    batch = 64 * words
+    batches = []
+    for first in range(0, len(sources), batch):
+        chunk = sources[first:first + batch]
+        batches.append(_bitset_counts(indptr, indices, G.number_of_nodes(), chunk, -(-len(chunk) // 64)))
+    levels = max((len(counts) for counts in batches), default=1)
+    result = np.zeros((levels, len(sources)), dtype=np.int64)
+    for first, counts in zip(range(0, len(sources), batch), batches):
+        result[:len(counts), first:first + counts.shape[1]] = counts
+    return result
+
+
+# Eccentricity, diameter, average distance and distance distribution of a CSR graph, over the pairs of
+# distinct nodes connected by a path. Exact with every node as a source; with samples sources picked at
+# random the averages come with 95% intervals from the spread over the sampled sources and the diameter
+# is a lower bound (the largest eccentricity seen)
+def distance_stats(G, samples=None, seed=None, words=WORDS):
+    n = G.number_of_nodes()
+    exact = samples is None or samples >= n
+    if exact:
+        sources = np.arange(n, dtype=np.int64)
+    else:
+        sources = np.sort(np.random.default_rng(seed).choice(n, size=samples, replace=False))
+    counts = distance_counts(G, sources, words)
+    levels = np.arange(len(counts))
+    reached = counts[1:].sum(axis=0)
+    totals = (levels[:, None] * counts).sum(axis=0)
+    eccentricity = np.array([np.flatnonzero(column)[-1] for column in counts.T], dtype=np.int64)
+    pairs = int(reached.sum())
+    distribution = counts[1:].sum(axis=1) / pairs if pairs else np.zeros(0)
+    stats = {'exact': exact, 'sources': sources, 'eccentricity': eccentricity,
+             'diameter': int(eccentricity.max()) if len(eccentricity) else 0,
+             'average_distance': float(totals.sum() / pairs) if pairs else 0.0,
+             'distribution': distribution, 'average_distance_ci': 0.0,
+             'distribution_ci': np.zeros(len(distribution))}
+    connected = reached > 0
+    if not exact and np.count_nonzero(connected) > 1:
+        k = np.count_nonzero(connected)
+        averages = totals[connected] / reached[connected]
+        stats['average_distance_ci'] = float(Z * averages.std(ddof=1) / np.sqrt(k))
+        fractions = counts[1:, connected] / reached[connected]
+        stats['distribution_ci'] = Z * fractions.std(axis=1, ddof=1) / np.sqrt(k)
+    return stats
@@ -0,0 +1,85 @@
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
+import generators
+
+# Sources of the breadth-first searches that estimate the average path length
+PATH_SAMPLES = 32
+# z value of the 95% confidence intervals
+Z = 1.96
+COLUMNS = ['c', 'runs', 'p_connected', 'p_connected_low', 'p_connected_high', 'giant_fraction',
+           'giant_fraction_ci', 'avg_path_length', 'avg_path_length_ci']
+
+
+# Generate one G(n, c ln(n) / n) graph and measure it, only the numbers go back to the parent process
+# Returns (connected, giant component fraction, average path length within the giant component)
+def run_trial(task):
+    n, c, seed, path_samples = task
+    rng = np.random.default_rng(seed)
+    src, dst = generators.erdos_renyi_edges(n, c * np.log(n) / n, rng)
+    adjacency = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n, n)).tocsr()
+    count, labels = connected_components(adjacency, directed=False)
+    sizes = np.bincount(labels)
+    giant = int(np.argmax(sizes))
+    members = np.flatnonzero(labels == giant)
+    # Path length estimated from breadth-first searches out of a sample of giant component nodes
+    sources = rng.choice(members, size=min(path_samples, len(members)), replace=False)
+    distances = shortest_path(adjacency, directed=False, unweighted=True, indices=sources)[:, members]
+    reached = distances[distances > 0]
+    path_length = float(reached.mean()) if len(reached) else 0.0
+    return count == 1, sizes[giant] / n, path_length
+
+
+# Mean and half width of the normal 95% interval
+def _mean_interval(values):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return float(values.mean()), 0.0
+    return float(values.mean()), float(Z * values.std(ddof=1) / np.sqrt(len(values)))
+
+
+# Wilson 95% interval of a proportion
+def _wilson_interval(successes, runs):
+    p = successes / runs
+    center = (p + Z * Z / (2 * runs)) / (1 + Z * Z / runs)
+    half = Z * np.sqrt(p * (1 - p) / runs + Z * Z / (4 * runs * runs)) / (1 + Z * Z / runs)
+    return float(max(center - half, 0.0)), float(min(center + half, 1.0))
+
+
+# Aggregate the trials of one value of c into a results row
+def summarize(c, trials):
+    connected = sum(trial[0] for trial in trials)
+    low, high = _wilson_interval(connected, len(trials))
+    giant, giant_ci = _mean_interval([trial[1] for trial in trials])
+    path, path_ci = _mean_interval([trial[2] for trial in trials])
+    return {'c': c, 'runs': len(trials), 'p_connected': connected / len(trials), 'p_connected_low': low,
+            'p_connected_high': high, 'giant_fraction': giant, 'giant_fraction_ci': giant_ci,
+            'avg_path_length': path, 'avg_path_length_ci': path_ci}
+
+
+# Run `runs` random graphs for every c on a process pool and append one row per c to results_file
+# as soon as all of its trials are done. Trial r of the i-th c always uses the seed (seed, i, r),
+# so the results do not depend on the number of workers
+def run_ensemble(n, cs, runs, results_file, workers=None, seed=0, path_samples=PATH_SAMPLES):
+    pending = {i: [] for i in range(len(cs))}
+    rows = []
+    start = time.perf_counter()
+    with open(results_file, 'w') as output, ProcessPoolExecutor(max_workers=workers) as executor:
+        output.write(','.join(COLUMNS) + '\n')
+        output.flush()
+        futures = {executor.submit(run_trial, (n, c, [seed, i, r], path_samples)): i
+                   for i, c in enumerate(cs) for r in range(runs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            pending[i].append(future.result())
+            if len(pending[i]) == runs:
+                row = summarize(cs[i], pending.pop(i))
+                rows.append(row)
+                output.write(','.join(f"{row[column]:.6g}" for column in COLUMNS) + '\n')
+                output.flush()
+                print(f"c = {cs[i]:.4g}: P(connected) = {row['p_connected']:.3f}, "
+                      f"giant = {row['giant_fraction']:.3f}, path length = {row['avg_path_length']:.3f} "
+                      f"({time.perf_counter() - start:.1f} s)")
+    return sorted(rows, key=lambda row: row['c'])
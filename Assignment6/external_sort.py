@@ -0,0 +1,206 @@
+import os
+import tempfile
+import numpy as np
+import binary_graph
+from compressed_io import open_text
+from node_labels import LabelTable, RangeLabels
+
+# Default memory budget of the converter
+MEMORY_BYTES = 1024 * 1024 * 1024
+# Bytes of text parsed per chunk of the edge list
+CHUNK_BYTES = 16 * 1024 * 1024
+# Working memory per edge of a run: the pairs, their sort permutation and the sorted copy
+RUN_BYTES_PER_EDGE = 48
+# Smallest number of edges read from a run per merge step
+MIN_MERGE_EDGES = 4096
+
+
+# Whether every one of the lines has exactly two whitespace separated tokens: the token starts, taken in
+# pairs, must fall between consecutive line ends
+def _two_columns(text, lines):
+    data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    filled = data > ord(' ')
+    starts = np.flatnonzero(filled[1:] & ~filled[:-1]) + 1
+    if len(data) and filled[0]:
+        starts = np.concatenate(([0], starts))
+    if len(starts) != 2 * lines:
+        return False
+    ends = np.flatnonzero(data == ord('\n'))
+    if len(ends) < lines:
+        ends = np.append(ends, len(data))
+    return bool(np.all(starts[1::2] < ends) and np.all(starts[2::2] > ends[:-1]))
+
+
+# Parse "u v ..." lines into two int64 arrays, extra columns, comments and blank lines are ignored
+def _parse_pairs(text):
+    lines = text.count('\n') + (0 if text.endswith('\n') else 1)
+    if '#' not in text and _two_columns(text, lines):
+        # Plain two column lists parse in one call; anything else takes the line by line path
+        values = np.fromstring(text, dtype=np.int64, sep=' ')
+        if len(values) == 2 * lines:
+            return values[0::2], values[1::2]
+    pairs = [line.split('#')[0].split()[:2] for line in text.splitlines()]
+    pairs = [pair for pair in pairs if len(pair) == 2]
+    values = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    return values[:, 0], values[:, 1]
+
+
+# Read an edge list of integer node labels in chunks of about chunk_bytes, yielding (u, v) arrays
+def read_edge_chunks(file_name, chunk_bytes=CHUNK_BYTES):
+    with open_text(file_name) as file:
+        while True:
+            text = file.read(chunk_bytes)
+            if not text:
+                break
+            # Finish the last line so no edge is split between two chunks
+            text += file.readline()
+            if text.strip():
+                yield _parse_pairs(text)
+
+
+# Sort pairs by (u, v), drop repeated ones and write them to a run file as interleaved int64
+def _spill_run(pieces, run_name):
+    u = np.concatenate([piece[0] for piece in pieces])
+    v = np.concatenate([piece[1] for piece in pieces])
+    order = np.lexsort((v, u))
+    u, v = u[order], v[order]
+    keep = np.ones(len(u), dtype=bool)
+    keep[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+    pairs = np.empty((np.count_nonzero(keep), 2), dtype=np.int64)
+    pairs[:, 0], pairs[:, 1] = u[keep], v[keep]
+    pairs.tofile(run_name)
+    return len(pairs)
+
+
+# Split the edges into sorted run files of at most memory_bytes working memory each
+# Returns the run files, their lengths and the sorted node labels (None when collect_nodes is False)
+def _write_runs(chunks, directed, memory_bytes, temp_dir, collect_nodes=True):
+    capacity = max(memory_bytes // RUN_BYTES_PER_EDGE, MIN_MERGE_EDGES)
+    runs, lengths = [], []
+    nodes = np.empty(0, dtype=np.int64)
+    pieces, node_pieces, pending = [], [], 0
+    for u, v in chunks:
+        if collect_nodes:
+            # Nodes that only have self-loops stay in the graph as isolated nodes
+            node_pieces += [np.unique(u), np.unique(v)]
+        loops = u == v
+        if loops.any():
+            u, v = u[~loops], v[~loops]
+        pieces.append((u, v))
+        if not directed:
+            pieces.append((v, u))
+        pending += len(u) * (1 if directed else 2)
+        if pending >= capacity:
+            runs.append(os.path.join(temp_dir, f"run{len(runs)}.bin"))
+            lengths.append(_spill_run(pieces, runs[-1]))
+            if node_pieces:
+                nodes = np.union1d(nodes, np.concatenate(node_pieces))
+            pieces, node_pieces, pending = [], [], 0
+    if pending:
+        runs.append(os.path.join(temp_dir, f"run{len(runs)}.bin"))
+        lengths.append(_spill_run(pieces, runs[-1]))
+    if node_pieces:
+        nodes = np.union1d(nodes, np.concatenate(node_pieces))
+    return runs, lengths, nodes if collect_nodes else None
+
+
+# K-way merge of the sorted runs, yielding batches of dense edge keys u * n + v in increasing order
+# Every run holds one block in memory; a batch takes the keys of every block up to the smallest
+# block end, so everything still on disk is larger than what has been emitted.
+# Run entries are labels looked up in the sorted nodes, or already dense ids when nodes is None
+def _merge_runs(runs, lengths, nodes, n, memory_bytes):
+    block_edges = max(memory_bytes // (RUN_BYTES_PER_EDGE * max(len(runs), 1)), MIN_MERGE_EDGES)
+    files = [open(run, 'rb') for run in runs]
+    try:
+        positions = [0] * len(runs)
+        blocks = [np.empty(0, dtype=np.int64) for _ in runs]
+        last = -1
+        while True:
+            for i, file in enumerate(files):
+                if len(blocks[i]) == 0 and positions[i] < lengths[i]:
+                    count = min(block_edges, lengths[i] - positions[i])
+                    pairs = np.fromfile(file, dtype=np.int64, count=2 * count).reshape(-1, 2)
+                    positions[i] += count
+                    if nodes is None:
+                        blocks[i] = pairs[:, 0] * n + pairs[:, 1]
+                    else:
+                        # Labels map to ids in the same order, so the run stays sorted
+                        blocks[i] = np.searchsorted(nodes, pairs[:, 0]) * n + np.searchsorted(nodes, pairs[:, 1])
+            live = [block for block in blocks if len(block)]
+            if not live:
+                break
+            bound = min(block[-1] for block in live)
+            batch = []
+            for i, block in enumerate(blocks):
+                split = int(np.searchsorted(block, bound, side='right'))
+                batch.append(block[:split])
+                blocks[i] = block[split:]
+            keys = np.sort(np.concatenate(batch))
+            keep = np.ones(len(keys), dtype=bool)
+            keep[1:] = keys[1:] != keys[:-1]
+            keys = keys[keep]
+            if len(keys) and keys[0] == last:
+                keys = keys[1:]
+            if len(keys):
+                last = keys[-1]
+                yield keys
+    finally:
+        for file in files:
+            file.close()
+
+
+# Sort edge chunks (pairs of int64 label arrays) out of core and write them as a binary graph
+# Duplicate edges and self-loops are dropped; undirected input is symmetrized.
+# With n given the chunks hold node ids 0..n-1 (labelled "0".."n-1"), including isolated nodes
+# Returns the number of nodes and stored (directed) edges
+def edges_to_binary_graph(chunks, out_file, directed=False, memory_bytes=MEMORY_BYTES, temp_dir=None, n=None):
+    temp_name = f"{out_file}.{os.getpid()}.tmp"
+    with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+        runs, lengths, nodes = _write_runs(chunks, directed, memory_bytes, run_dir, collect_nodes=n is None)
+        if n is None:
+            n = len(nodes)
+            labels = LabelTable.from_labels(nodes.tolist())
+        else:
+            labels = RangeLabels(n)
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+        indptr_bytes = (n + 1) * 8
+        indices_offset = binary_graph.HEADER.size + indptr_bytes + binary_graph._padding(indptr_bytes)
+        degrees = np.zeros(n, dtype=np.int64)
+        m = 0
+        try:
+            with open(temp_name, 'wb') as file:
+                # Neighbor ids are streamed to their section; header and indptr are filled in afterwards
+                file.seek(indices_offset)
+                for keys in _merge_runs(runs, lengths, nodes, n, memory_bytes):
+                    sources, counts = np.unique(keys // n, return_counts=True)
+                    degrees[sources] += counts
+                    (keys % n).astype(index_dtype).tofile(file)
+                    m += len(keys)
+                file.write(b'\x00' * binary_graph._padding(m * np.dtype(index_dtype).itemsize))
+                for section in (np.asarray(labels.offsets, dtype=np.int64),
+                                np.asarray(labels.buffer, dtype=np.uint8),
+                                np.asarray(labels.sorted_order(), dtype=np.int64)):
+                    section.tofile(file)
+                    file.write(b'\x00' * binary_graph._padding(section.nbytes))
+                flags = (binary_graph.FLAG_DIRECTED if directed else 0) | binary_graph.FLAG_LABEL_ORDER \
+                    | (binary_graph.FLAG_WIDE_INDICES if index_dtype == np.int64 else 0)
+                indptr = np.zeros(n + 1, dtype=np.int64)
+                np.cumsum(degrees, out=indptr[1:])
+                file.seek(0)
+                file.write(binary_graph.HEADER.pack(binary_graph.MAGIC, binary_graph.VERSION, flags, n, m,
+                                                    len(labels.buffer)))
+                indptr.tofile(file)
+            os.replace(temp_name, out_file)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+    return n, m
+
+
+# Convert an edge list with integer node labels, possibly larger than memory, to a binary graph file
+# Peak memory stays around memory_bytes plus 8 bytes per node for the label table
+def convert_edgelist(file_name, out_file, directed=False, memory_bytes=MEMORY_BYTES, temp_dir=None):
+    chunk_bytes = max(min(CHUNK_BYTES, memory_bytes // 8), 1)
+    return edges_to_binary_graph(read_edge_chunks(file_name, chunk_bytes), out_file, directed,
+                                 memory_bytes, temp_dir)
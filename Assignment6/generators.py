@@ -0,0 +1,181 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from csr_graph import CSRGraph, build_csr
+from node_labels import RangeLabels
+import external_sort
+
+# create_random_graph returns a CSR graph instead of a networkx graph from this many nodes on
+CSR_MIN_NODES = 100000
+# Upper bound on the number of gaps drawn at a time
+MAX_BATCH = 1 << 22
+# Expected number of edges in one chunk of a graph generated straight to a file
+CHUNK_EDGES = 1 << 22
+
+
+# Pair (i, j), j < i, of every index k into the lower triangle k = i * (i - 1) / 2 + j
+def _triangle_pairs(k):
+    i = ((1 + np.sqrt(1 + 8 * k.astype(np.float64))) / 2).astype(np.int64)
+    # The square root can be off by one for very large k
+    i -= i * (i - 1) // 2 > k
+    i += (i + 1) * i // 2 <= k
+    return i, k - i * (i - 1) // 2
+
+
+# Sorted indices of the present slots in [first, last) when each slot is present with probability p
+# The gaps between present slots are geometric, so only the present slots are visited
+def _present_slots(first, last, p, rng):
+    if p <= 0 or last <= first:
+        return np.empty(0, dtype=np.int64)
+    p = min(p, 1.0)
+    slots = []
+    position = first - 1
+    while position < last:
+        remaining = last - position - 1
+        batch = int(min(remaining * p + 6 * np.sqrt(remaining * p) + 64, MAX_BATCH))
+        chosen = position + np.cumsum(rng.geometric(p, size=batch))
+        position = int(chosen[-1])
+        slots.append(chosen[chosen < last])
+    return np.concatenate(slots)
+
+
+# Edge arrays of a G(n, p) random graph: every pair is present independently with probability p,
+# pair (i, j), j < i, being slot i * (i - 1) / 2 + j; only the edges are visited, not all n(n-1)/2 pairs
+def erdos_renyi_edges(n, p, rng):
+    return _triangle_pairs(_present_slots(0, n * (n - 1) // 2, p, rng))
+
+
+# G(n, p) random graph straight into CSR, with labels "0".."n-1"
+def erdos_renyi_csr(n, p, seed=None):
+    src, dst = erdos_renyi_edges(n, p, np.random.default_rng(seed))
+    return edges_to_csr(n, src, dst)
+
+
+# Edge arrays of a random bipartite graph: node sets 0..n-1 and n..n+m-1, every pair (u, v) across
+# the sets present independently with probability p (pair (u, n + v) is slot u * m + v)
+def bipartite_edges(n, m, p, rng):
+    k = _present_slots(0, n * m, p, rng)
+    return k // m, n + k % m
+
+
+# Sample a connected random bipartite graph: the same model as regenerating until the graph is connected
+# (the random graph conditioned on being connected), with each attempt cheap. Attempts with an isolated
+# node are rejected by a degree count before the components are computed in scipy.
+# Returns the edge arrays and the number of attempts
+def connected_bipartite_edges(n, m, p, rng, max_attempts=None):
+    attempts = 0
+    while max_attempts is None or attempts < max_attempts:
+        attempts += 1
+        src, dst = bipartite_edges(n, m, p, rng)
+        degrees = np.bincount(src, minlength=n + m) + np.bincount(dst, minlength=n + m)
+        if n + m > 1 and degrees.min() == 0:
+            continue
+        adjacency = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n + m, n + m))
+        if connected_components(adjacency, directed=False, return_labels=False) == 1:
+            return src, dst, attempts
+    raise RuntimeError(f"No connected bipartite graph found in {attempts} attempts, p may be too small.")
+
+
+# Split the slots [0, pairs) into chunks of about CHUNK_EDGES expected edges; the split depends only on
+# pairs and p, never on the number of workers
+def _slot_chunks(pairs, p):
+    size = max(pairs if p <= 0 else int(CHUNK_EDGES / min(p, 1.0)), 1)
+    return [(first, min(first + size, pairs)) for first in range(0, pairs, size)]
+
+
+# Edges of one chunk, drawn from the chunk's own random stream
+def _generate_chunk(task):
+    kind, n, m, p, first, last, seed = task
+    slots = _present_slots(first, last, p, np.random.default_rng(seed))
+    if kind == 'bipartite':
+        return slots // m, n + slots % m
+    return _triangle_pairs(slots)
+
+
+# Results of function over tasks, in task order, with at most two tasks per worker in flight
+def _ordered_results(function, tasks, workers):
+    if workers <= 1:
+        for task in tasks:
+            yield function(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for task in tasks:
+            window.append(executor.submit(function, task))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+# Generate chunks in worker processes and stream them into a binary graph file. Chunk i always draws
+# from child i of SeedSequence(seed), so the file is bit-identical for a seed whatever the worker count
+def _generate_file(kind, nodes, n, m, p, pairs, out_file, seed, workers, memory_bytes):
+    chunks = _slot_chunks(pairs, p)
+    streams = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(kind, n, m, p, first, last, stream) for (first, last), stream in zip(chunks, streams)]
+    results = _ordered_results(_generate_chunk, tasks, workers or os.cpu_count() or 1)
+    return external_sort.edges_to_binary_graph(results, out_file, memory_bytes=memory_bytes, n=nodes)
+
+
+# G(n, p) random graph generated in chunks straight to a binary graph file
+# Returns the number of nodes and stored (directed) edges
+def erdos_renyi_file(n, p, out_file, seed=None, workers=None, memory_bytes=external_sort.MEMORY_BYTES):
+    return _generate_file('erdos-renyi', n, n, 0, p, n * (n - 1) // 2, out_file, seed, workers, memory_bytes)
+
+
+# Random bipartite graph generated in chunks straight to a binary graph file (not conditioned on connectivity)
+def bipartite_file(n, m, p, out_file, seed=None, workers=None, memory_bytes=external_sort.MEMORY_BYTES):
+    return _generate_file('bipartite', n + m, n, m, p, n * m, out_file, seed, workers, memory_bytes)
+
+
+# Edge arrays of a Barabasi-Albert graph with n nodes where every node attaches m edges
+# Edge slot k = v * m + i is written as targets (2k, 2k + 1) into a repeated-nodes list: position 2k holds v
+# and position 2k + 1 a copy of an earlier position r, chosen uniformly (Batagelj-Brandes), so nodes are picked
+# with probability proportional to their degree. All positions are drawn at once; odd positions pointing to
+# other odd positions are resolved by pointer chasing over the whole array at once
+def barabasi_albert_edges(n, m, rng):
+    slots = n * m
+    k = np.arange(slots, dtype=np.int64)
+    pointers = np.floor(rng.random(slots) * 2 * k).astype(np.int64)
+    targets = np.full(slots, -1, dtype=np.int64)
+    pending = k
+    positions = pointers
+    while len(pending):
+        even = positions % 2 == 0
+        targets[pending[even]] = positions[even] // 2 // m
+        pending, positions = pending[~even], pointers[(positions[~even] - 1) // 2]
+    src = k // m
+    # Slot 0 has nothing earlier to copy, it and any repeated edges are dropped by the caller's CSR build
+    keep = src != targets
+    return src[keep], targets[keep]
+
+
+# Power-law degree sequence P(d) ~ d^-gamma, d >= min_degree, with an even sum
+def power_law_degrees(n, gamma, min_degree, rng):
+    degrees = np.floor(min_degree * rng.random(n) ** (-1 / (gamma - 1))).astype(np.int64)
+    degrees = np.minimum(degrees, n - 1)
+    if degrees.sum() % 2:
+        degrees[np.argmin(degrees)] += 1
+    return degrees
+
+
+# Edge arrays of a configuration model graph: stubs of the degree sequence shuffled and paired up
+# Self-loops are dropped here and repeated edges by the CSR build (the erased configuration model)
+def configuration_edges(degrees, rng):
+    degrees = np.asarray(degrees, dtype=np.int64)
+    if degrees.sum() % 2:
+        raise ValueError("The sum of the degree sequence must be even.")
+    stubs = rng.permutation(np.repeat(np.arange(len(degrees), dtype=np.int64), degrees))
+    src, dst = stubs[0::2], stubs[1::2]
+    keep = src != dst
+    return src[keep], dst[keep]
+
+
+# CSR graph with labels "0".."n-1" from undirected edge arrays
+def edges_to_csr(n, src, dst):
+    indptr, indices, _ = build_csr(src, dst, n)
+    return CSRGraph(indptr, indices, RangeLabels(n))
@@ -0,0 +1,134 @@
+import os
+import gc
+import json
+import pickle
+import hashlib
+import binary_graph
+
+# Parsed graphs are cached here, CSR graphs in the binary graph format and networkx graphs pickled
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cecs427-graphs')
+# Least recently used entries are evicted once the cache grows past this size
+CACHE_BUDGET_BYTES = 2 * 1024 * 1024 * 1024
+INDEX_FILE = 'index.json'
+PICKLE_EXTENSION = '.pickle'
+
+
+# Hash the file contents in blocks
+def content_hash(file_name):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat_key(file_name):
+    stat = os.stat(file_name)
+    return f"{os.path.abspath(file_name)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+# Write through a temporary file so a crash never leaves a half-written file behind
+def _replace_atomically(path, write):
+    temp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(temp)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _save_index(cache_dir, index):
+    def write(path):
+        with open(path, 'w') as file:
+            json.dump(index, file)
+    _replace_atomically(os.path.join(cache_dir, INDEX_FILE), write)
+
+
+# Remove least recently used entries until the cache fits in the budget
+def evict(cache_dir=CACHE_DIR, budget=CACHE_BUDGET_BYTES):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith((binary_graph.EXTENSION, PICKLE_EXTENSION)):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= budget:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+
+
+# Entry file of a parse result: kinds ending in 'csr' hold CSR graphs, the others networkx graphs
+def _entry_name(cache_dir, kind, digest):
+    extension = binary_graph.EXTENSION if kind.endswith('csr') else PICKLE_EXTENSION
+    return os.path.join(cache_dir, f"{kind}-{digest}{extension}")
+
+
+def _read_entry(entry, kind):
+    if kind.endswith('csr'):
+        return binary_graph.read_binary_graph(entry)
+    # Unpickling creates an object per node and edge, collecting garbage in between would only slow it down
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(entry, 'rb') as file:
+            return pickle.load(file)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _write_entry(G, path, kind):
+    if kind.endswith('csr'):
+        binary_graph.write_binary_graph(G, path)
+    else:
+        with open(path, 'wb') as file:
+            pickle.dump(G, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# Return the graph read from file_name, from the cache when the file has not changed
+# kind separates results of different readers; read_function(file_name) parses the file on a miss
+def cached_read(file_name, kind, read_function, cache_dir=CACHE_DIR, budget=CACHE_BUDGET_BYTES):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        index = _load_index(cache_dir)
+        key = _stat_key(file_name)
+        digest = index.get(key)
+        if digest is None:
+            # Size or mtime changed (or first read): hash the contents, an unchanged file still hits
+            digest = content_hash(file_name)
+        entry = _entry_name(cache_dir, kind, digest)
+        if os.path.exists(entry):
+            # Touch the entry so eviction sees it as recently used
+            os.utime(entry)
+            if index.get(key) != digest:
+                index[key] = digest
+                _save_index(cache_dir, index)
+            return _read_entry(entry, kind)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return read_function(file_name)
+
+    G = read_function(file_name)
+    if G is None:
+        return None
+    try:
+        _replace_atomically(entry, lambda path: _write_entry(G, path, kind))
+        # Forget older versions of the same file
+        path = key.rsplit('|', 2)[0]
+        index = {k: v for k, v in index.items() if k.rsplit('|', 2)[0] != path}
+        index[key] = digest
+        _save_index(cache_dir, index)
+        evict(cache_dir, budget)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"Could not cache '{file_name}': {e}")
+    return G
@@ -0,0 +1,204 @@
+import os
+import threading
+import numpy as np
+import binary_graph
+from csr_graph import CSRGraph, build_csr
+from node_labels import LabelTable
+
+# Edit records are appended to the log in batches of this many records
+BATCH_RECORDS = 4096
+# The log is folded into the snapshot in the background once it grows past this size
+COMPACT_BYTES = 64 * 1024 * 1024
+LOG_SUFFIX = '.log'
+
+# One DeltaLog per snapshot file, so every writer shares the same batch and compaction thread
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def log_name(file_name):
+    return file_name + LOG_SUFFIX
+
+
+# Format one edit record: "+ u v [w]" adds (or re-weights) an edge, "- u v" removes it
+def _format_record(op, u, v, weight=None):
+    if weight is None:
+        return f"{op} {u} {v}\n"
+    return f"{op} {u} {v} {weight!r}\n"
+
+
+# Parse the log into the final state of every edited edge, later records win
+# Returns {(u, v): (op, weight)}; undirected edges are keyed with both orders
+def read_edits(file_name, directed, end=None):
+    edits = {}
+    try:
+        with open(log_name(file_name), 'rb') as file:
+            data = file.read() if end is None else file.read(end)
+    except FileNotFoundError:
+        return edits
+    for line in data.decode('utf-8').splitlines():
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        weight = float(parts[3]) if len(parts) > 3 else None
+        edits[(parts[1], parts[2])] = (parts[0], weight)
+        if not directed:
+            edits[(parts[2], parts[1])] = (parts[0], weight)
+    return edits
+
+
+# Label table with new labels appended after the existing ones
+def _extend_labels(labels, new_labels):
+    if not new_labels:
+        return labels
+    extra = LabelTable.from_labels(new_labels)
+    offsets = np.concatenate([np.asarray(labels.offsets), extra.offsets[1:] + labels.offsets[-1]])
+    return LabelTable(offsets, np.concatenate([np.asarray(labels.buffer), extra.buffer]))
+
+
+# Apply the final edit states to a CSR graph, returning a new CSR graph
+# A weighted '+' record on an unweighted snapshot makes the result weighted: the other edges get weight 1,
+# which is what networkx assumes for a missing weight
+def apply_edits(G, edits):
+    if not edits:
+        return G
+    new_labels = []
+    ids = {}
+
+    def node_id(label):
+        u = ids.get(label)
+        if u is None:
+            try:
+                u = G.node_id(label)
+            except KeyError:
+                u = G.number_of_nodes() + len(new_labels)
+                new_labels.append(label)
+            ids[label] = u
+        return u
+
+    ends = np.array([(node_id(u), node_id(v)) for u, v in edits], dtype=np.int64).reshape(-1, 2)
+    added = np.array([op == '+' for op, _ in edits.values()], dtype=bool)
+    n = G.number_of_nodes() + len(new_labels)
+    src = np.repeat(np.arange(G.number_of_nodes(), dtype=np.int64), np.diff(G.indptr))
+    dst = np.asarray(G.indices, dtype=np.int64)
+    # Every edited edge is dropped from the snapshot, the added ones come back with their new weight
+    keep = ~np.isin(src * n + dst, ends[:, 0] * n + ends[:, 1])
+    src = np.concatenate([src[keep], ends[added, 0]])
+    dst = np.concatenate([dst[keep], ends[added, 1]])
+    weights = None
+    if G.weights is not None or any(op == '+' and weight is not None for op, weight in edits.values()):
+        old_weights = np.ones(len(keep), dtype=np.float64) if G.weights is None else np.asarray(G.weights)
+        new_weights = [1.0 if weight is None else weight for op, weight in edits.values() if op == '+']
+        weights = np.concatenate([old_weights[keep], np.array(new_weights, dtype=np.float64)])
+    indptr, indices, weights = build_csr(src, dst, n, G.directed, weights)
+    return CSRGraph(indptr, indices, _extend_labels(G.labels, new_labels), weights, G.directed)
+
+
+# Read a snapshot together with the edits in its log (only the first end bytes of the log when given)
+def read_delta_graph(file_name, end=None):
+    G = binary_graph.read_binary_graph(file_name)
+    return apply_edits(G, read_edits(file_name, G.directed, end))
+
+
+# Base snapshot plus an append-only log of edge edits
+# Edits are buffered and appended in batches; once the log passes compact_bytes a background thread
+# writes a new snapshot with the edits applied and keeps only the records appended meanwhile
+class DeltaLog:
+    def __init__(self, file_name, compact_bytes=COMPACT_BYTES, batch_records=BATCH_RECORDS):
+        self.file_name = file_name
+        self.compact_bytes = compact_bytes
+        self.batch_records = batch_records
+        self._pending = []
+        self._lock = threading.Lock()
+        self._compaction = None
+
+    def add_edge(self, u, v, weight=None):
+        self._append(_format_record('+', u, v, weight))
+
+    def remove_edge(self, u, v):
+        self._append(_format_record('-', u, v))
+
+    # Append a list of (op, u, v[, weight]) records
+    def extend(self, records):
+        for record in records:
+            self._append(_format_record(*record))
+
+    def _append(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_records:
+            self.flush()
+
+    # Write the buffered records with one append, then compact when the log has grown too large
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                with open(log_name(self.file_name), 'a', encoding='utf-8') as file:
+                    file.write(''.join(self._pending))
+                self._pending = []
+            size = os.path.getsize(log_name(self.file_name)) if os.path.exists(log_name(self.file_name)) else 0
+        if size >= self.compact_bytes and not self.compacting():
+            self._compaction = threading.Thread(target=self.compact, args=(size,))
+            self._compaction.start()
+
+    def compacting(self):
+        return self._compaction is not None and self._compaction.is_alive()
+
+    # Wait for a running compaction to finish
+    def wait(self):
+        if self._compaction is not None:
+            self._compaction.join()
+
+    # Fold the first end bytes of the log into a new snapshot
+    def compact(self, end):
+        G = read_delta_graph(self.file_name, end)
+        temp = f"{self.file_name}.{os.getpid()}.tmp"
+        try:
+            binary_graph.write_binary_graph(G, temp)
+            del G
+            with self._lock:
+                # Keep the records appended while the snapshot was being written
+                with open(log_name(self.file_name), 'rb') as file:
+                    file.seek(end)
+                    tail = file.read()
+                os.replace(temp, self.file_name)
+                with open(log_name(self.file_name), 'wb') as file:
+                    file.write(tail)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    # Replace the snapshot with a full copy of G and start an empty log
+    def write_snapshot(self, G):
+        self.wait()
+        temp = f"{self.file_name}.{os.getpid()}.tmp"
+        with self._lock:
+            self._pending = []
+            # G may be memory-mapped from the snapshot itself, so the old file is only replaced at the end
+            try:
+                binary_graph.write_binary_graph(G, temp)
+                os.replace(temp, self.file_name)
+            finally:
+                if os.path.exists(temp):
+                    os.remove(temp)
+            if os.path.exists(log_name(self.file_name)):
+                os.remove(log_name(self.file_name))
+
+
+# Shared DeltaLog of a snapshot file
+def delta_log(file_name):
+    key = os.path.abspath(file_name)
+    with _logs_lock:
+        if key not in _logs:
+            _logs[key] = DeltaLog(file_name)
+        return _logs[key]
+
+
+# Whether the log of a snapshot holds edits; buffered edits of this process are written out first and a
+# running compaction is waited for, so the snapshot and the log on disk are complete and consistent
+def has_edits(file_name):
+    with _logs_lock:
+        log = _logs.get(os.path.abspath(file_name))
+    if log is not None:
+        log.flush()
+        log.wait()
+    return os.path.exists(log_name(file_name)) and os.path.getsize(log_name(file_name)) > 0
@@ -0,0 +1,119 @@
+import os
+import shutil
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Number of edges formatted per vectorized block
+BLOCK_EDGES = 1 << 20
+# Number of formatted blocks handed to one writelines call
+BLOCKS_PER_WRITE = 8
+# Buffer size of the output file
+WRITE_BUFFER_BYTES = 16 * 1024 * 1024
+# Smaller graphs are written by one process, starting workers would cost more than it saves
+PARALLEL_MIN_EDGES = 1 << 24
+
+# Graph seen by the worker processes, set by the pool initializer
+_shared_graph = None
+
+
+# Copy the segments source[starts[i]:starts[i] + lengths[i]] to out[targets[i]:targets[i] + lengths[i]]
+def _scatter(out, targets, source, starts, lengths):
+    ends = np.cumsum(lengths)
+    step = np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - lengths, lengths)
+    out[np.repeat(targets, lengths) + step] = source[np.repeat(starts, lengths) + step]
+
+
+# Format the edges of rows [first, last) as "u v [w]" lines, one bytes object per block of edges
+def format_edge_blocks(G, first, last, block_edges=BLOCK_EDGES):
+    offsets = np.asarray(G.labels.offsets)
+    buffer = np.asarray(G.labels.buffer)
+    lengths = np.diff(offsets)
+    row = first
+    while row < last:
+        # Take whole rows until the block holds about block_edges edges
+        end = int(np.searchsorted(G.indptr, G.indptr[row] + block_edges, side='right')) - 1
+        end = min(max(end, row + 1), last)
+        start_edge, end_edge = G.indptr[row], G.indptr[end]
+        u = np.repeat(np.arange(row, end), np.diff(G.indptr[row:end + 1]))
+        v = np.asarray(G.indices[start_edge:end_edge], dtype=np.int64)
+        keep = slice(None)
+        if not G.directed:
+            # Each undirected edge is stored twice, write it once
+            keep = u <= v
+            u, v = u[keep], v[keep]
+        row = end
+        if len(u) == 0:
+            continue
+        # Line layout: label u, space, label v, [space, weight,] newline
+        line_lengths = lengths[u] + lengths[v] + 2
+        if G.weights is not None:
+            strings = list(map(repr, np.asarray(G.weights[start_edge:end_edge])[keep].tolist()))
+            text = np.frombuffer(''.join(strings).encode('ascii'), dtype=np.uint8)
+            weight_lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+            line_lengths += weight_lengths + 1
+        line_ends = np.cumsum(line_lengths)
+        line_starts = line_ends - line_lengths
+        out = np.empty(line_ends[-1], dtype=np.uint8)
+        _scatter(out, line_starts, buffer, offsets[u], lengths[u])
+        out[line_starts + lengths[u]] = ord(' ')
+        _scatter(out, line_starts + lengths[u] + 1, buffer, offsets[v], lengths[v])
+        if G.weights is not None:
+            out[line_starts + lengths[u] + lengths[v] + 1] = ord(' ')
+            _scatter(out, line_starts + lengths[u] + lengths[v] + 2, text,
+                     np.cumsum(weight_lengths) - weight_lengths, weight_lengths)
+        out[line_ends - 1] = ord('\n')
+        yield out.tobytes()
+
+
+# Write rows [first, last) of G to file_name with large buffered writelines calls
+def write_edge_range(G, file_name, first, last, block_edges=BLOCK_EDGES):
+    with open(file_name, 'wb', buffering=WRITE_BUFFER_BYTES) as file:
+        pending = []
+        for block in format_edge_blocks(G, first, last, block_edges):
+            pending.append(block)
+            if len(pending) == BLOCKS_PER_WRITE:
+                file.writelines(pending)
+                pending = []
+        file.writelines(pending)
+
+
+def _share_graph(G):
+    global _shared_graph
+    _shared_graph = G
+
+
+def _write_shard(task):
+    file_name, first, last, block_edges = task
+    write_edge_range(_shared_graph, file_name, first, last, block_edges)
+    return file_name
+
+
+# Split the rows into contiguous shards holding about the same number of edges
+def shard_rows(G, shards):
+    targets = np.linspace(0, G.indptr[-1], shards + 1)
+    bounds = np.searchsorted(G.indptr, targets, side='left')
+    bounds[0], bounds[-1] = 0, G.number_of_nodes()
+    bounds = np.maximum.accumulate(bounds)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+# Write a CSR graph as a text edge list (each undirected edge once, weights appended when present)
+# With workers > 1 every worker writes one shard and the shards are concatenated in order
+def write_edgelist(G, file_name, workers=1, block_edges=BLOCK_EDGES):
+    if workers <= 1 or len(G.indices) < PARALLEL_MIN_EDGES:
+        write_edge_range(G, file_name, 0, G.number_of_nodes(), block_edges)
+        return
+    tasks = [(f"{file_name}.part{i}", first, last, block_edges)
+             for i, (first, last) in enumerate(shard_rows(G, workers))]
+    try:
+        # With the fork start method the workers inherit the graph instead of receiving a pickled copy
+        with ProcessPoolExecutor(max_workers=workers, initializer=_share_graph, initargs=(G,)) as executor:
+            parts = list(executor.map(_write_shard, tasks))
+        with open(file_name, 'wb') as file:
+            for part in parts:
+                with open(part, 'rb') as shard:
+                    shutil.copyfileobj(shard, file, WRITE_BUFFER_BYTES)
+    finally:
+        for part, _, _, _ in tasks:
+            if os.path.exists(part):
+                os.remove(part)
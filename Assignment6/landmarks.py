@@ -0,0 +1,193 @@
+import os
+import heapq
+import numpy as np
+import shortest_paths
+
+# Default number of landmarks
+LANDMARKS = 16
+# Unreachable marker of the uint16 hop distances
+UNREACHABLE = np.iinfo(np.uint16).max
+INDEX_SUFFIX = '.alt.npz'
+
+
+def index_name(graph_file):
+    return graph_file + INDEX_SUFFIX
+
+
+# Distances from source to every node: uint16 hop counts by BFS on unweighted graphs (float32 when deeper,
+# still exact), float64 by Dijkstra on weighted ones. Rounding weighted distances to float32 would not keep
+# the bounds admissible, a difference of two rounded values can overestimate the true difference
+def _distances(G, source):
+    n = G.number_of_nodes()
+    if G.weights is None:
+        dist = np.full(n, -1, dtype=np.int64)
+        parent = np.full(n, -1, dtype=np.int64)
+        parent[source] = source
+        dist[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+        while len(frontier):
+            frontier = shortest_paths._expand(G, frontier, parent)
+            level += 1
+            dist[frontier] = level
+        if level < UNREACHABLE:
+            return np.where(dist < 0, UNREACHABLE, dist).astype(np.uint16)
+        # Deeper than uint16 can count
+        return np.where(dist < 0, np.inf, dist).astype(np.float32)
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        start, end = G.indptr[u], G.indptr[u + 1]
+        for v, w in zip(G.indices[start:end].tolist(), G.weights[start:end].tolist()):
+            if d + w < dist[v]:
+                dist[v] = d + w
+                heapq.heappush(heap, (d + w, v))
+    return dist
+
+
+# Distances as float64 with inf for unreachable nodes
+def _as_float(dist):
+    if dist.dtype == np.uint16:
+        values = dist.astype(np.float64)
+        values[dist == UNREACHABLE] = np.inf
+        return values
+    return dist.astype(np.float64)
+
+
+# Pick k landmarks: the highest degree nodes, or farthest-point (each next landmark is the node farthest
+# from the ones picked so far). Returns the landmarks and their distance arrays (forward, backward)
+def select_landmarks(G, k=LANDMARKS, method='farthest'):
+    k = min(k, G.number_of_nodes())
+    reverse = G.reverse()
+    degrees = G.degree() + (G.in_degree() if G.directed else 0)
+    landmarks, forward, backward = [], [], []
+    if method == 'degree':
+        landmarks = np.argsort(degrees, kind='stable')[::-1][:k].tolist()
+    closest = np.full(G.number_of_nodes(), np.inf)
+    for i in range(k):
+        if method != 'degree':
+            if i == 0:
+                u = int(np.argmax(degrees))
+            else:
+                # Unreached nodes (inf) are only chosen when everything reachable is already covered
+                finite = np.where(np.isinf(closest), -1.0, closest)
+                u = int(np.argmax(finite))
+                if finite[u] <= 0:
+                    break
+            landmarks.append(u)
+        forward.append(_distances(G, landmarks[i]))
+        backward.append(_distances(reverse, landmarks[i]) if G.directed else forward[-1])
+        closest = np.minimum(closest, _as_float(forward[-1]))
+    # Mixed uint16 and float32 hop counts are all stored as float32, which holds them exactly
+    if any(dist.dtype != forward[0].dtype for dist in forward + backward):
+        forward = [_as_float(dist).astype(np.float32) for dist in forward]
+        backward = [_as_float(dist).astype(np.float32) for dist in backward]
+    return np.array(landmarks, dtype=np.int64), np.array(forward), np.array(backward)
+
+
+# Landmark (ALT) distance oracle: the triangle inequality over the landmark distances gives lower bounds
+# d(v, t) >= max(d(L, t) - d(L, v), d(v, L) - d(t, L)) that steer an A* search, and an O(k) estimate
+class LandmarkOracle:
+    def __init__(self, G, landmarks, forward, backward):
+        self.G = G
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.answer_for(G)
+
+    # Graph the oracle answers queries for and its version; for a networkx graph that G is a CSR copy of,
+    # nodes[u] is the node of dense id u
+    def answer_for(self, owner, nodes=None, version=0):
+        self.owner = owner
+        self.nodes = nodes
+        self.node_ids = None if nodes is None else {node: u for u, node in enumerate(nodes)}
+        self.version = version
+
+    @classmethod
+    def build(cls, G, k=LANDMARKS, method='farthest'):
+        return cls(G, *select_landmarks(G, k, method))
+
+    # Save the index next to the graph file, with the graph file's size and mtime to detect changes
+    def save(self, graph_file):
+        stat = os.stat(graph_file)
+        np.savez(index_name(graph_file), landmarks=self.landmarks, forward=self.forward,
+                 backward=self.backward, source=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64))
+
+    # Load the index stored next to the graph file, None when there is none or the graph file changed
+    @classmethod
+    def load(cls, G, graph_file):
+        try:
+            with np.load(index_name(graph_file)) as index:
+                stat = os.stat(graph_file)
+                if index['source'].tolist() != [stat.st_size, stat.st_mtime_ns]:
+                    return None
+                if index['forward'].shape[1] != G.number_of_nodes():
+                    return None
+                return cls(G, index['landmarks'], index['forward'], index['backward'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # Load the index of graph_file, building and saving it first when needed
+    @classmethod
+    def load_or_build(cls, G, graph_file, k=LANDMARKS, method='farthest'):
+        oracle = cls.load(G, graph_file)
+        if oracle is None:
+            oracle = cls.build(G, k, method)
+            oracle.save(graph_file)
+        return oracle
+
+    # Lower bound on the distance from every node in nodes to target
+    def lower_bounds(self, nodes, target):
+        with np.errstate(invalid='ignore'):
+            to_target = _as_float(self.forward[:, target])[:, None] - _as_float(self.forward[:, nodes])
+            from_target = _as_float(self.backward[:, nodes]) - _as_float(self.backward[:, target])[:, None]
+        bounds = np.fmax(to_target, from_target)
+        # inf - inf says nothing about the distance
+        bounds[np.isnan(bounds)] = 0.0
+        return np.maximum(bounds.max(axis=0, initial=0.0), 0.0)
+
+    # O(k) estimate of the distance from source to target: (lower bound, upper bound through a landmark)
+    def estimate(self, source, target):
+        lower = float(self.lower_bounds(np.array([source]), target)[0])
+        upper = float(np.min(_as_float(self.backward[:, source]) + _as_float(self.forward[:, target]),
+                             initial=np.inf))
+        return lower, upper
+
+    # A* search between dense ids guided by the landmark bounds; returns (id path or None, settled nodes)
+    def shortest_path(self, source, target):
+        G = self.G
+        if self.lower_bounds(np.array([source]), target)[0] == np.inf:
+            return None, 0
+        potential = {}
+
+        def h(nodes):
+            missing = [u for u in nodes if u not in potential]
+            if missing:
+                potential.update(zip(missing, self.lower_bounds(np.array(missing), target).tolist()))
+            return [potential[u] for u in nodes]
+
+        dist = {source: 0.0}
+        parent = {source: source}
+        done = set()
+        heap = [(h([source])[0], source)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            if u == target:
+                return shortest_paths.tree_path({v: parent[v] for v in done}, target), len(done)
+            start, end = G.indptr[u], G.indptr[u + 1]
+            neighbors = G.indices[start:end].tolist()
+            weights = [1.0] * len(neighbors) if G.weights is None else G.weights[start:end].tolist()
+            improved = [(v, dist[u] + w) for v, w in zip(neighbors, weights)
+                        if dist[u] + w < dist.get(v, float('inf'))]
+            for (v, d), bound in zip(improved, h([v for v, _ in improved])):
+                dist[v] = d
+                parent[v] = u
+                heapq.heappush(heap, (d + bound, v))
+        return None, len(done)
@@ -0,0 +1,127 @@
+import numpy as np
+from collections import OrderedDict
+import binary_graph
+from node_labels import LabelTable
+
+# Number of consecutive nodes whose neighbor lists are read from disk together
+BLOCK_NODES = 1024
+# Memory budget of the cached adjacency blocks
+CACHE_BYTES = 64 * 1024 * 1024
+# Binary graph files at least this large are opened lazily by read_graph
+LAZY_MIN_BYTES = 1024 * 1024 * 1024
+
+
+# Graph backed by a binary graph file that reads neighbor blocks on demand.
+# Only the node -> offset index (indptr) and the labels are memory-mapped; the adjacency of
+# BLOCK_NODES consecutive nodes is read with one seek and read and kept in a bounded LRU,
+# so memory grows with the part of the graph a query touches, not with the size of the graph.
+class LazyGraph:
+    def __init__(self, file_name, cache_bytes=CACHE_BYTES, block_nodes=BLOCK_NODES):
+        self.file_name = file_name
+        flags, n, m, self._layout = binary_graph.read_layout(file_name)
+        self.directed = bool(flags & binary_graph.FLAG_DIRECTED)
+        self.indptr = binary_graph.map_section(file_name, self._layout, 'indptr')
+        self.labels = LabelTable(binary_graph.map_section(file_name, self._layout, 'offsets'),
+                                 binary_graph.map_section(file_name, self._layout, 'buffer'),
+                                 binary_graph.map_section(file_name, self._layout, 'order'))
+        self.cache_bytes = cache_bytes
+        self.block_nodes = block_nodes
+        self._blocks = OrderedDict()
+        self._cached_bytes = 0
+        self._file = open(file_name, 'rb', buffering=0)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        if getattr(self, '_file', None) is not None and not self._file.closed:
+            self._file.close()
+        self._blocks = OrderedDict()
+        self._cached_bytes = 0
+
+    # Memory-map the whole graph, for algorithms that need all of it
+    def load(self):
+        return binary_graph.read_binary_graph(self.file_name)
+
+    def __del__(self):
+        self.close()
+
+    def is_directed(self):
+        return self.directed
+
+    def number_of_nodes(self):
+        return len(self.indptr) - 1
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def label(self, u):
+        return self.labels[u]
+
+    def node_id(self, label):
+        return self.labels.node_id(label)
+
+    def _read(self, name, first, last):
+        offset, dtype, _ = self._layout[name]
+        count = int(last - first)
+        data = np.empty(count, dtype=dtype)
+        self._file.seek(offset + int(first) * dtype.itemsize)
+        self._file.readinto(data)
+        return data
+
+    # Neighbor ids and weights (None when unweighted) of every node in one block
+    def _block(self, block):
+        cached = self._blocks.get(block)
+        if cached is not None:
+            self._blocks.move_to_end(block)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        first_node = block * self.block_nodes
+        last_node = min(first_node + self.block_nodes, self.number_of_nodes())
+        starts = np.array(self.indptr[first_node:last_node + 1], dtype=np.int64)
+        indices = self._read('indices', starts[0], starts[-1])
+        weights = self._read('weights', starts[0], starts[-1]) if 'weights' in self._layout else None
+        cached = (starts - starts[0], indices, weights)
+        self._blocks[block] = cached
+        self._cached_bytes += indices.nbytes + starts.nbytes + (weights.nbytes if weights is not None else 0)
+        # Drop the least recently used blocks, but always keep the one just read
+        while self._cached_bytes > self.cache_bytes and len(self._blocks) > 1:
+            _, (old_starts, old_indices, old_weights) = self._blocks.popitem(last=False)
+            self._cached_bytes -= old_indices.nbytes + old_starts.nbytes + \
+                (old_weights.nbytes if old_weights is not None else 0)
+        return cached
+
+    # Neighbors of the dense node id u, read from disk when the block is not cached
+    def neighbors(self, u):
+        starts, indices, _ = self._block(u // self.block_nodes)
+        k = u % self.block_nodes
+        return indices[starts[k]:starts[k + 1]]
+
+    # Neighbors of u together with the edge weights (all 1 when unweighted)
+    def weighted_neighbors(self, u):
+        starts, indices, weights = self._block(u // self.block_nodes)
+        k = u % self.block_nodes
+        neighbors = indices[starts[k]:starts[k + 1]]
+        if weights is None:
+            return neighbors, np.ones(len(neighbors))
+        return neighbors, weights[starts[k]:starts[k + 1]]
+
+
+# Breadth-first search that only touches the neighborhoods it expands, returns the id path or None
+def bfs_path(G, source, target):
+    parent = {source: source}
+    frontier = [source]
+    while frontier and target not in parent:
+        next_frontier = []
+        for u in frontier:
+            for v in G.neighbors(u).tolist():
+                if v not in parent:
+                    parent[v] = u
+                    next_frontier.append(v)
+        frontier = next_frontier
+    if target not in parent:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(parent[path[-1]])
+    return path[::-1]
@@ -1,3 +1,5 @@
+import os
+import time
 import json
 import random
 import neal
@@ -10,19 +12,62 @@ import dwave_networkx as dnx
 import matplotlib.pyplot as plt
 from dwave_networkx.algorithms import structural_imbalance
 from networkx.algorithms.assortativity import attribute_assortativity_coefficient
+import csr_graph
+import binary_graph
+import parallel_parse
+import graph_cache
+import compressed_io
+import graph_writer
+import market_io
+import lazy_graph
+import external_sort
+import graph_delta
+import generators
+import ensemble
+import shortest_paths
+import batch_queries
+import landmarks
+import path_cache
+import od_demand
+import distance_stats
+from csr_graph import CSRGraph
+from lazy_graph import LazyGraph
 
 sampler = neal.SimulatedAnnealingSampler()
 dnx.set_default_sampler(sampler)  # set default sampler
 
 
 # Read a graph from an external file in adjacency list format
-def read_graph(file_name):
+# Large files (or csr=True) are streamed into a compact CSR graph instead of a networkx graph
+# Parsed files are kept in an on-disk cache so reading an unchanged file again skips parsing
+def read_graph(file_name, csr=None, use_cache=True, lazy=None):
     try:
+        # Binary graph files are memory-mapped instead of parsed, very large ones are opened lazily
+        if binary_graph.is_binary_graph(file_name):
+            if lazy or (lazy is None and os.path.getsize(file_name) >= lazy_graph.LAZY_MIN_BYTES):
+                if not os.path.exists(graph_delta.log_name(file_name)):
+                    return LazyGraph(file_name)
+            # A snapshot with a change log is loaded with the logged edits applied
+            if os.path.exists(graph_delta.log_name(file_name)):
+                G = graph_delta.read_delta_graph(file_name)
+            else:
+                G = binary_graph.read_binary_graph(file_name)
+            # Linked to its snapshot, so saving it there again only appends its edits to the change log
+            G.graph['delta_file'] = os.path.abspath(file_name)
+            return G
+        if csr is None:
+            csr = os.path.getsize(file_name) >= csr_graph.CSR_THRESHOLD_BYTES
+        if use_cache:
+            return graph_cache.cached_read(file_name, 'graph-csr' if csr else 'graph',
+                                           lambda name: read_graph(name, csr, use_cache=False))
+        if csr:
+            return csr_graph.read_graph_csr(file_name)
+
         # Create an empty graph
         G = nx.Graph()
 
         # Read the adjacency list from the file
-        with open(file_name, 'r') as file:
+        with compressed_io.open_text(file_name) as file:
             for line in file:
                 # Remove comments and whitespace
                 line = line.split('#')[0].strip()
@@ -47,20 +92,20 @@ def read_graph(file_name):
 
 
 # Read a Digraph
-def read_weighted_digraph(file_name):
+# Large files (or parallel=True) are parsed in byte ranges by worker processes into a CSR graph
+def read_weighted_digraph(file_name, parallel=None, workers=None, use_cache=True):
     try:
-        # Create an empty graph
-        G = nx.DiGraph()
-
-        # Read the adjacency list from the file
-        with open(file_name, 'r') as file:
-            for line in file:
-                parts = line.strip().split()
-                source = parts[0]
-                target = parts[1]
-
-                G.add_edge(source, target)
-        return G
+        if parallel is None:
+            parallel = os.path.getsize(file_name) >= csr_graph.CSR_THRESHOLD_BYTES
+        # Cached like in read_graph
+        if use_cache:
+            return graph_cache.cached_read(file_name, 'digraph-csr' if parallel else 'digraph',
+                                           lambda name: read_weighted_digraph(name, parallel, workers, False))
+        if parallel:
+            return parallel_parse.read_weighted_digraph_csr(file_name, workers)
+
+        # Same line rules as the parallel reader: '#' comments and blank lines are skipped
+        return parallel_parse.read_weighted_digraph_nx(file_name)
     # Throw error for when file is not found
     except FileNotFoundError:
         print(f"File '{file_name}' not found.")
@@ -72,10 +117,25 @@ def read_weighted_digraph(file_name):
 
 
 # Write the graph to an external file in adjacency list format
+# File names ending in .csrg are written in the binary graph format. Saving a graph to the snapshot it
+# was read from or last saved to only appends the edits made since (partition_graph and covid record
+# them in G.graph['pending_edits']) to the snapshot's change log instead of rewriting the file
 def save_graph(G, file_name):
     try:
+        if file_name.endswith(binary_graph.EXTENSION):
+            attributes = getattr(G, 'graph', {})
+            log = graph_delta.delta_log(file_name)
+            if attributes.get('delta_file') == os.path.abspath(file_name) and os.path.exists(file_name):
+                log.extend(attributes.get('pending_edits', []))
+                log.flush()
+            else:
+                log.write_snapshot(G)
+                attributes['delta_file'] = os.path.abspath(file_name)
+            attributes['pending_edits'] = []
+        elif isinstance(G, CSRGraph):
+            graph_writer.write_edgelist(G, file_name, workers=os.cpu_count() or 1)
         # Write the graph to the file in adjacency list format
-        if isinstance(G, nx.DiGraph):
+        elif isinstance(G, nx.DiGraph):
             # Directed graph
             nx.write_weighted_edgelist(G, file_name)
         elif isinstance(G, nx.Graph):
@@ -89,13 +149,34 @@ def save_graph(G, file_name):
         print(f"Error saving graph to '{file_name}': {e}")
 
 
+# Convert an edge list with integer nodes, possibly larger than memory, to a binary graph file
+# Duplicate edges and self-loops are dropped; the converted file can be read with read_graph
+def convert_edgelist(file_name, out_file, directed=False, memory_bytes=external_sort.MEMORY_BYTES):
+    try:
+        n, m = external_sort.convert_edgelist(file_name, out_file, directed, memory_bytes)
+        print(f"Converted '{file_name}' to '{out_file}' ({n} nodes, {m if directed else m // 2} edges).")
+    except FileNotFoundError:
+        print(f"File '{file_name}' not found.")
+    except Exception as e:
+        print(f"Error converting '{file_name}': {e}")
+
+
 # Create an Erdos-Renyi random graph with n nodes and probability p = c+(ln(n)/ n)
-def create_random_graph(n, c):
+# Edges are drawn in time proportional to their number; large graphs (or csr=True) are built as CSR graphs.
+# With out_file the graph is generated in parallel chunks straight to that binary graph file and read back
+def create_random_graph(n, c, csr=None, seed=None, out_file=None):
     try:
         # Set up p
         p = c * (ln(n) / n)
-        # Create an Erdos-Renyi graph with n and p
-        G = nx.erdos_renyi_graph(n, p)
+        if csr is None:
+            csr = n >= generators.CSR_MIN_NODES
+        if out_file:
+            generators.erdos_renyi_file(n, p, out_file, seed)
+            G = read_graph(out_file)
+        else:
+            # Create an Erdos-Renyi graph with n and p
+            src, dst = generators.erdos_renyi_edges(n, p, np.random.default_rng(seed))
+            G = graph_from_edges(n, src, dst, csr)
         print(f"Erdos-Renyi random graph with {n} nodes created successfully.")
         # Return the graph G to main
         return G
@@ -104,6 +185,45 @@ def create_random_graph(n, c):
         return None
 
 
+# Graph with nodes 0..n-1 from edge arrays, a CSR graph when csr is set and a networkx graph otherwise
+def graph_from_edges(n, src, dst, csr):
+    if csr:
+        return generators.edges_to_csr(n, src, dst)
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(zip(src.tolist(), dst.tolist()))
+    return G
+
+
+# Create a Barabasi-Albert preferential attachment graph with n nodes, each attaching m edges
+def create_barabasi_albert_graph(n, m, csr=None, seed=None):
+    try:
+        if csr is None:
+            csr = n >= generators.CSR_MIN_NODES
+        src, dst = generators.barabasi_albert_edges(n, m, np.random.default_rng(seed))
+        G = graph_from_edges(n, src, dst, csr)
+        print(f"Barabasi-Albert graph with {n} nodes created successfully.")
+        return G
+    except Exception as e:
+        print(f"Error creating Barabasi-Albert graph: {e}")
+        return None
+
+
+# Create a configuration model graph from a degree sequence (self-loops and repeated edges are dropped)
+def create_configuration_graph(degrees, csr=None, seed=None):
+    try:
+        n = len(degrees)
+        if csr is None:
+            csr = n >= generators.CSR_MIN_NODES
+        src, dst = generators.configuration_edges(degrees, np.random.default_rng(seed))
+        G = graph_from_edges(n, src, dst, csr)
+        print(f"Configuration model graph with {n} nodes created successfully.")
+        return G
+    except Exception as e:
+        print(f"Error creating configuration model graph: {e}")
+        return None
+
+
 # Create a karate graph
 def create_karate_graph():
     # Create the Karate Club graph
@@ -118,26 +238,28 @@ def create_karate_graph():
 
 
 # Creates a random bipartite graph with node sets A and B and edge (u, v) exists with probability p where u in A and v in B.def create_bipartite_graph(n, m, p):
-def create_bipartite_graph(n, m, p):
-    while True:
-        G = nx.bipartite.random_graph(n, m, p)
-        if nx.is_connected(G):
-            return G
+# Rejects disconnected samples like before, but every attempt is a vectorized draw and a scipy component count.
+# With out_file the graph is generated in parallel chunks straight to that binary graph file and read back;
+# such a graph is a single sample and is not conditioned on being connected
+def create_bipartite_graph(n, m, p, seed=None, max_attempts=None, out_file=None):
+    start = time.perf_counter()
+    if out_file:
+        generators.bipartite_file(n, m, p, out_file, seed)
+        print(f"Bipartite graph written to '{out_file}' in {time.perf_counter() - start:.3f} seconds.")
+        return read_graph(out_file)
+    src, dst, attempts = generators.connected_bipartite_edges(n, m, p, np.random.default_rng(seed), max_attempts)
+    G = nx.Graph()
+    G.add_nodes_from(range(n), bipartite=0)
+    G.add_nodes_from(range(n, n + m), bipartite=1)
+    G.add_edges_from(zip(src.tolist(), dst.tolist()))
+    print(f"Connected bipartite graph found after {attempts} attempts in {time.perf_counter() - start:.3f} seconds.")
+    return G
 
 
 # Market clearing with the given file format.
+# Valuations are parsed straight into an ndarray; large markets keep a memory-mapped .npy sidecar
 def market_clearing(filename):
-    valuations = []
-    with open(filename, 'r') as file:
-        # Parse file contents
-        line = file.readline()
-        n = int(line.strip().split(" ")[0])
-        prices = list(map(int, line.strip().split(" ")[1].split(",")))
-
-        lines = file.readlines()
-        for line in lines:
-            values = list(map(int, line.strip().split(',')))
-            valuations.append(values)
+    n, prices, valuations = market_io.read_market(filename)
     # Print the parsed data (optional)
     # print(n)
     # print(prices)
@@ -145,18 +267,63 @@ def market_clearing(filename):
     return n, prices, valuations
 
 
+# Translate a node typed by the user into the graph's own key: a dense id for CSR graphs,
+# otherwise the label itself or its integer value (generated graphs use integer nodes)
+def node_key(G, label):
+    if isinstance(G, (CSRGraph, LazyGraph)):
+        return G.node_id(label)
+    if label in G:
+        return label
+    if label.strip().lstrip('-').isdigit() and int(label) in G:
+        return int(label)
+    raise nx.NodeNotFound(f"Node {label} not found in the graph.")
+
+
 # Find the shortest path between source and target nodes in graph G
-def shortest_path(G, source, target):
+# A landmark oracle built for G turns the search into A* guided by the landmark bounds; otherwise
+# a PathCache answers sources queried before from cached shortest-path trees, while a source's first
+# query goes to the bidirectional search
+def shortest_path(G, source, target, oracle=None, cache=None):
     try:
+        if oracle_answers(oracle, G):
+            path, settled = oracle.shortest_path(oracle_id(oracle, source), oracle_id(oracle, target))
+            print(f"Settled {settled} of {oracle.G.number_of_nodes()} nodes.")
+            if path is None:
+                raise nx.NetworkXNoPath
+            return [G.label(u) for u in path] if oracle.nodes is None else [oracle.nodes[u] for u in path]
+        if cache is not None and not isinstance(G, LazyGraph):
+            tree = cache.lookup(G, node_key(G, source))
+            if tree is not None:
+                path = shortest_paths.tree_path(tree, node_key(G, target))
+                print(f"Path cache: {cache.hits} hits, {cache.misses} misses.")
+                if path is None:
+                    raise nx.NetworkXNoPath
+                return [G.label(u) for u in path] if isinstance(G, CSRGraph) else path
+        if isinstance(G, CSRGraph):
+            # Bidirectional search over dense ids (Dijkstra when weighted), translated back to labels
+            path, settled = shortest_paths.shortest_path(G, node_key(G, source), node_key(G, target))
+            print(f"Settled {settled} of {G.number_of_nodes()} nodes.")
+            if path is None:
+                raise nx.NetworkXNoPath
+            return [G.label(u) for u in path]
+        if isinstance(G, LazyGraph):
+            # Only the neighborhoods the search reaches are read from disk
+            path = lazy_graph.bfs_path(G, node_key(G, source), node_key(G, target))
+            if path is None:
+                raise nx.NetworkXNoPath
+            return [G.label(u) for u in path]
+        # Weighted graphs (read_weighted_digraph keeps the weight column) use their weights
+        if nx.is_weighted(G):
+            return nx.bidirectional_dijkstra(G, node_key(G, source), node_key(G, target))[1]
         # Compute the shortest path
-        path = nx.shortest_path(G, source=int(source), target=int(target))
+        path = nx.shortest_path(G, source=node_key(G, source), target=node_key(G, target))
         return path
     # Throw error when there are no path between the source and target
     except nx.NetworkXNoPath:
         print(f"No path found from {source} to {target}.")
         return None
     # Throw error when nodes are not found
-    except nx.NodeNotFound:
+    except (nx.NodeNotFound, KeyError):
         print(f"Node {source} or {target} not found in the graph.")
         return None
     # Throw error when the program can't find the shortest path
@@ -165,16 +332,139 @@ def shortest_path(G, source, target):
         return None
 
 
+# Print the O(k) landmark bounds on the distance between source and target instead of searching
+def estimate_distance(oracle, source, target):
+    try:
+        lower, upper = oracle.estimate(oracle_id(oracle, source), oracle_id(oracle, target))
+        if lower == np.inf:
+            print(f"No path found from {source} to {target}.")
+        else:
+            print(f"Distance from {source} to {target} is between {lower:g} and {upper:g}.")
+        return lower, upper
+    except (nx.NodeNotFound, KeyError):
+        print(f"Node {source} or {target} not found in the graph.")
+        return None
+
+
+# Whether the landmark oracle answers for G as it is now (G has not been edited since the index was built)
+def oracle_answers(oracle, G):
+    return oracle is not None and oracle.owner is G and oracle.version == path_cache.graph_version(G)
+
+
+# Dense id in the oracle's CSR graph of a node label of the graph the oracle answers for
+def oracle_id(oracle, label):
+    node = node_key(oracle.owner, label)
+    return node if oracle.node_ids is None else oracle.node_ids[node]
+
+
+# Build (or load, when one is stored next to graph_file) the landmark index of a graph
+# networkx graphs are indexed through a CSR copy kept inside the oracle, G itself is left as it is
+def build_landmarks(G, k, method, graph_file=None):
+    try:
+        index_graph = G.load() if isinstance(G, LazyGraph) else G
+        if not isinstance(index_graph, CSRGraph):
+            index_graph = csr_graph.from_networkx(G)
+        if graph_file:
+            oracle = landmarks.LandmarkOracle.load_or_build(index_graph, graph_file, k, method)
+        else:
+            oracle = landmarks.LandmarkOracle.build(index_graph, k, method)
+        if isinstance(G, (CSRGraph, LazyGraph)):
+            oracle.answer_for(G, version=path_cache.graph_version(G))
+        else:
+            oracle.answer_for(G, list(G.nodes()), path_cache.graph_version(G))
+        print(f"Landmark index with {len(oracle.landmarks)} landmarks ready.")
+        return oracle
+    except Exception as e:
+        print(f"Error building landmark index: {e}")
+        return None
+
+
+# Eccentricity, diameter and average distance from bitset breadth-first searches, exact or over samples sources
+def distance_statistics(G, samples=None, seed=None):
+    try:
+        if isinstance(G, LazyGraph):
+            G = G.load()
+        if not isinstance(G, CSRGraph):
+            G = csr_graph.from_networkx(G)
+        stats = distance_stats.distance_stats(G, samples, seed)
+        if stats['exact']:
+            print(f"Diameter: {stats['diameter']}")
+            print(f"Average distance: {stats['average_distance']:.4f}")
+        else:
+            print(f"Diameter: at least {stats['diameter']} ({len(stats['sources'])} sampled sources)")
+            print(f"Average distance: {stats['average_distance']:.4f} +/- {stats['average_distance_ci']:.4f}")
+        eccentricity = stats['eccentricity']
+        if len(eccentricity):
+            print(f"Eccentricity of the sources: min {eccentricity.min()}, mean {eccentricity.mean():.2f}, "
+                  f"max {eccentricity.max()}")
+        print("Distance distribution:")
+        for d, (fraction, ci) in enumerate(zip(stats['distribution'], stats['distribution_ci']), start=1):
+            print(f"  {d}: {fraction:.4f}" + (f" +/- {ci:.4f}" if not stats['exact'] else ""))
+        return stats
+    except Exception as e:
+        print(f"Error computing distance statistics: {e}")
+        return None
+
+
+# networkx copy of a CSR graph for the algorithms that remove edges in place; the copy keeps the graph
+# attributes, so the snapshot link and pending edits still reach save_graph
+# The whole graph is converted, so graphs past csr_graph.NETWORKX_MAX_ENTRIES are refused instead of
+# exhausting memory; networkx graphs are edited as they are
+def editable_graph(G):
+    if isinstance(G, (CSRGraph, LazyGraph)) and int(G.indptr[-1]) > csr_graph.NETWORKX_MAX_ENTRIES:
+        raise ValueError(f"Graph is too large to edit in memory ({int(G.indptr[-1])} adjacency entries, "
+                         f"at most {csr_graph.NETWORKX_MAX_ENTRIES}).")
+    if isinstance(G, LazyGraph):
+        file_name = G.file_name
+        G = G.load()
+        G.graph['delta_file'] = os.path.abspath(file_name)
+    if isinstance(G, CSRGraph):
+        H = G.to_networkx()
+        H.graph.update(G.graph)
+        return H
+    return G
+
+
+# Kept so save_graph can append the removals to a snapshot's change log
+def record_removals(G, edges):
+    G.graph.setdefault('pending_edits', []).extend(('-', u, v) for u, v in edges)
+
+
+# Edge of highest (unnormalized) betweenness within the component nodes and its value, None without edges
+def _top_betweenness(G, nodes):
+    # A copy of the component, betweenness over a subgraph view is several times slower
+    betweenness = nx.edge_betweenness_centrality(G.subgraph(nodes).copy(), normalized=False)
+    if not betweenness:
+        return None
+    edge = max(betweenness, key=betweenness.get)
+    return edge, betweenness[edge]
+
+
+# Girvan-Newman: remove the edge of highest betweenness until G has num_components components
+# Removing an edge only changes betweenness inside its own component, so the betweenness is cached per component
+# and only the component that lost the edge is recomputed. Unnormalized values keep components comparable
 def partition_graph(G, num_components):
     try:
-        # cur_num_connected = nx.number_connected_components(G)
-        # print(f"Graph has initially {cur_num_connected} connected components.")
+        G = editable_graph(G)
         edges_removed = 0
-        while nx.number_connected_components(G) < num_components:
-            edge_betweenness = nx.edge_betweenness_centrality(G)
-            max_betweenness_edge = max(edge_betweenness, key=edge_betweenness.get)
-            G.remove_edge(*max_betweenness_edge)
+        components = [set(nodes) for nodes in nx.connected_components(G)]
+        # Edge of highest betweenness and its value in every component (None when it has no edges)
+        tops = [_top_betweenness(G, nodes) for nodes in components]
+        while len(components) < num_components:
+            candidates = [i for i, top in enumerate(tops) if top is not None]
+            if not candidates:
+                raise ValueError(f"No edges left, the graph has only {len(components)} components.")
+            i = max(candidates, key=lambda k: tops[k][1])
+            edge = tops[i][0]
+            G.remove_edge(*edge)
+            path_cache.bump_version(G)
+            record_removals(G, [edge])
             edges_removed += 1
+            # The component either stays whole or splits in two, both parts get fresh betweenness
+            parts = [set(nodes) for nodes in nx.connected_components(G.subgraph(components.pop(i)))]
+            tops.pop(i)
+            components += parts
+            tops += [_top_betweenness(G, nodes) for nodes in parts]
 
         print(f"Removed {edges_removed} edges")
         print(f"Graph partitioned into {num_components} components.")
@@ -185,14 +475,17 @@ def partition_graph(G, num_components):
 
 
 def find_equilibrium(G, n, source, destination):
-    # Calculate the shortest paths for all pairs of nodes
-    all_shortest_paths = dict(nx.all_pairs_dijkstra_path(G))
+    # Route the n drivers as a 1x1 origin-destination demand; the search stops at the destination
+    routes, flows = od_demand.route_demand(G, {(source, destination): n})
+    cost, path, volume = routes[(source, destination)]
+    if path is None:
+        raise nx.NetworkXNoPath(f"No path found from {source} to {destination}.")
 
     # Calculate the social optimum
-    social_optimum = sum([len(all_shortest_paths[source][destination]) - 1 for _ in range(n)])
+    social_optimum = (len(path) - 1) * volume
 
     # Calculate the Nash equilibrium
-    nash_equilibrium = len(all_shortest_paths[source][destination]) - 1
+    nash_equilibrium = len(path) - 1
 
     return social_optimum, nash_equilibrium
 
@@ -260,7 +553,7 @@ def compute_preferred_seller(n, prices, valuations):
 
         for buyer, house in buyer_to_preferred_seller.items():
             if house is not None and house not in matched_houses:
-                assignments[buyer] = {'house': house + 1, 'payoff': (valuations[buyer][house] - prices[house])}
+                assignments[buyer] = {'house': house + 1, 'payoff': int(valuations[buyer][house] - prices[house])}
                 remaining_houses.remove(house)
                 remaining_buyers.remove(buyer)
                 matched_houses.add(house)
@@ -383,12 +676,18 @@ def plot_preferred_seller_graph(G, buyers, assignments):
 
 # Plot the subgraph with all the nodes where the PageRank is at least lower_bound and at most upper_bound
 def plot_pagerank(G, pr, lower_bound, upper_bound):
-    pageRankDict = nx.pagerank(G)
-    with open('pageRanks.txt', 'w') as outputFile:
-        outputFile.write(json.dumps(pageRankDict))
+    if isinstance(G, CSRGraph):
+        # Only the plotted nodes are turned into a networkx graph
+        ranks = csr_graph.pagerank(G)
+        filtered_nodes = np.flatnonzero((ranks >= lower_bound) & (ranks <= upper_bound))
+        subgraph = G.to_networkx(filtered_nodes)
+    else:
+        pageRankDict = nx.pagerank(G)
+        with open('pageRanks.txt', 'w') as outputFile:
+            outputFile.write(json.dumps(pageRankDict))
 
-    filtered_nodes = [node for node, rank in pr.items() if lower_bound <= rank <= upper_bound]
-    subgraph = G.subgraph(filtered_nodes)
+        filtered_nodes = [node for node, rank in pr.items() if lower_bound <= rank <= upper_bound]
+        subgraph = G.subgraph(filtered_nodes)
 
     plt.figure(figsize=(12, 6))
     pos = nx.spring_layout(subgraph)
@@ -399,9 +698,15 @@ def plot_pagerank(G, pr, lower_bound, upper_bound):
 
 # plot in degree distribution on log log scale
 def loglog_plot(G):
-    degree_seq = sorted([d for n, d in G.in_degree()], reverse=True)
-    degreeCount = collections.Counter(degree_seq)
-    deg, cnt = zip(*degreeCount.items())
+    if isinstance(G, LazyGraph):
+        G = G.load()
+    if isinstance(G, CSRGraph):
+        # Count degrees directly on the arrays
+        deg, cnt = np.unique(G.in_degree(), return_counts=True)
+    else:
+        degree_seq = sorted([d for n, d in G.in_degree()], reverse=True)
+        degreeCount = collections.Counter(degree_seq)
+        deg, cnt = zip(*degreeCount.items())
     # sort, count occurrences, and make them seperate in degree value
     plt.loglog(deg, cnt, 'bo-')
     plt.title("Log-Log-Plot")
@@ -462,6 +767,8 @@ def covid(graph, p, lifespan, shelter, r):
         # Shelter-in-place measures
         edges_to_remove = random.sample(list(graph.edges()), int(shelter * len(graph.edges())))
         graph.remove_edges_from(edges_to_remove)
+        path_cache.bump_version(graph)
+        record_removals(graph, edges_to_remove)
 
         # Vaccination
         vaccinated = random.sample(list(susceptible), int(r * len(susceptible)))
@@ -519,6 +826,8 @@ def main():
     buyers = None
     perfect_match = None
     page_rank = None
+    oracle = None
+    paths = path_cache.PathCache()
     n, prices, valuations = None, None, None
     plot_shortest_path = False
     plot_cluster_coefficient = False
@@ -532,6 +841,7 @@ def main():
         print("4. Create a Graph")
         print("5. Algorithms")
         print("6. Plot G")
+        print("7. Convert an Edge List")
         print("x. Exit")
 
         choice = input("Enter your choice: ")
@@ -585,7 +895,9 @@ def main():
             print("B. Karate-Club Graph")
             print("C. Bipartite Graph")
             print("D. Market-clearing")
-            sub = input("Enter your choice (a/b/c/d): ")
+            print("E. Barabasi-Albert Graph")
+            print("F. Configuration Model Graph")
+            sub = input("Enter your choice (a/b/c/d/e/f): ")
             if sub.lower() == "a":
                 try:
                     n = int(input("Enter number of nodes: "))
@@ -593,7 +905,8 @@ def main():
                     # Check if n or c is negative
                     if n <= 0 or c <= 0:
                         raise ValueError("Invalid inputs. Number of nodes n and parameter c must be positive.")
-                    graph = create_random_graph(n, c)
+                    out_file = input("Enter a binary graph file to generate into (empty to keep it in memory): ")
+                    graph = create_random_graph(n, c, out_file=out_file or None)
                     # Reset shortest path prevent errors with other graph
                     shortest = None
                     print("Random Graph created successfully")
@@ -617,7 +930,8 @@ def main():
                     # Check if n or m is negative
                     if n <= 0 or m <= 0:
                         raise ValueError("Invalid inputs. Number of nodes n and m must be positive.")
-                    graph = create_bipartite_graph(n, m, p)
+                    out_file = input("Enter a binary graph file to generate into (empty to keep it in memory): ")
+                    graph = create_bipartite_graph(n, m, p, out_file=out_file or None)
                     # Reset shortest path prevent errors with other graph
                     shortest = None
                     bipartite = True
@@ -630,6 +944,35 @@ def main():
             elif sub.lower() == "d":
                 file_name = input("Enter file name: ")
                 n, prices, valuations = market_clearing(file_name)
+            elif sub.lower() == "e":
+                try:
+                    n = int(input("Enter number of nodes: "))
+                    m = int(input("Enter number of edges per new node: "))
+                    if n <= 0 or m <= 0:
+                        raise ValueError("Invalid inputs. Number of nodes n and edges m must be positive.")
+                    graph = create_barabasi_albert_graph(n, m)
+                    shortest = None
+                    bipartite = False
+                except ValueError as e:
+                    print(f"Error: {e}")
+            elif sub.lower() == "f":
+                try:
+                    file_name = input("Enter a degree sequence file (empty for a power-law sequence): ")
+                    if file_name:
+                        with compressed_io.open_text(file_name) as file:
+                            degrees = np.array(file.read().split(), dtype=np.int64)
+                    else:
+                        n = int(input("Enter number of nodes: "))
+                        gamma = float(input("Enter the power-law exponent: "))
+                        min_degree = int(input("Enter the minimum degree: "))
+                        if n <= 0 or gamma <= 1 or min_degree <= 0:
+                            raise ValueError("Invalid inputs. n and minimum degree must be positive, exponent above 1.")
+                        degrees = generators.power_law_degrees(n, gamma, min_degree, np.random.default_rng())
+                    graph = create_configuration_graph(degrees)
+                    shortest = None
+                    bipartite = False
+                except ValueError as e:
+                    print(f"Error: {e}")
             else:
                 print("Invalid choice. Please try again.")
 
@@ -643,7 +986,11 @@ def main():
             print("F. PageRank")
             print("G. Cascade Effect")
             print("H. COVID-19")
-            sub = input("Enter your choice (a/b/c/d/e/f/g/h): ")
+            print("I. Random Graph Ensemble")
+            print("J. Batch Shortest Paths")
+            print("K. Landmark Index")
+            print("L. Distance Statistics")
+            sub = input("Enter your choice (a/b/c/d/e/f/g/h/i/j/k/l): ")
 
             if sub.lower() == "a":
                 try:
@@ -651,11 +998,15 @@ def main():
                         raise ValueError("Graph is not defined.")
                     source = input("Enter source node: ")
                     target = input("Enter target node: ")
-                    shortest = shortest_path(graph, source, target)
-                    if shortest is None:
-                        print("Error: No shortest path found.")
+                    if oracle_answers(oracle, graph) and \
+                            input("Is an approximate distance enough? (y/n): ").lower() == "y":
+                        estimate_distance(oracle, source, target)
                     else:
-                        print(f"Shortest path from {source} to {target}: {shortest}")
+                        shortest = shortest_path(graph, source, target, oracle, paths)
+                        if shortest is None:
+                            print("Error: No shortest path found.")
+                        else:
+                            print(f"Shortest path from {source} to {target}: {shortest}")
                 except ValueError as e:
                     print(f"Error: {e}")
                 except Exception as e:
@@ -667,7 +1018,9 @@ def main():
                         raise ValueError("Graph is not defined.")
                     num_components = int(input("Enter number of components: "))
                     part = partition_graph(graph, num_components)
-                    graph = part
+                    # A refused or failed partition keeps the current graph
+                    if part is not None:
+                        graph = part
                 except ValueError as e:
                     print(f"Error: {e}")
                 except Exception as e:
@@ -678,8 +1031,8 @@ def main():
                     if 'graph' not in locals():
                         raise ValueError("Graph is not defined.")
                     n = int(input("Enter number of drivers: "))
-                    source = int(input("Enter the initial node: "))
-                    destination = int(input("Enter the destination node: "))
+                    source = node_key(graph, input("Enter the initial node: "))
+                    destination = node_key(graph, input("Enter the destination node: "))
                     social_optimum, nash_equilibrium = find_equilibrium(graph, n, source, destination)
                 except ValueError as e:
                     print(f"Error: {e}")
@@ -695,16 +1048,26 @@ def main():
                 print("Preferred Seller Graph computed successfully ")
                 
             elif sub.lower() == "f":
-                page_rank = nx.pagerank(graph)
-                print("PageRank computed successfully!")
-                print("PageRank values:", page_rank)
+                if isinstance(graph, LazyGraph):
+                    # PageRank needs every edge, map the whole file
+                    graph = graph.load()
+                if isinstance(graph, CSRGraph):
+                    ranks = csr_graph.pagerank(graph)
+                    page_rank = ranks
+                    print("PageRank computed successfully!")
+                    top = np.argsort(ranks)[::-1][:10]
+                    print("Top PageRank values:", {graph.label(u): float(ranks[u]) for u in top})
+                else:
+                    page_rank = nx.pagerank(graph)
+                    print("PageRank computed successfully!")
+                    print("PageRank values:", page_rank)
             
             elif sub.lower() == "g":
                 try:
                     l = []
                     m = int(input("Enter the number of initiators: "))
                     for i in range (m): 
-                        x = int(input("Enter the node: "))
+                        x = node_key(graph, input("Enter the node: "))
                         l.append(x)
                     print("Initiators: ", l)
                     q = float(input("Enter the threshold of the cascade: "))
@@ -717,7 +1080,8 @@ def main():
             elif sub.lower() == "h":
                 try:
                     file_name = input("Enter the edgelist: ")
-                    graph = nx.read_edgelist(file_name)
+                    with compressed_io.open_binary(file_name) as file:
+                        graph = nx.read_edgelist(file)
                     p = float(input("Enter the fraction of initially infected nodes: "))
                     lifespan = int(input("Enter the period days of the simulation: "))
                     shelter = float(input("Enter the fraction of edges that are not considered by the shelter-in-place: "))
@@ -729,6 +1093,63 @@ def main():
                 except Exception as e:
                     print(f"Error: {e}")
             
+            elif sub.lower() == "i":
+                try:
+                    n = int(input("Enter number of nodes: "))
+                    c_low = float(input("Enter the smallest parameter c: "))
+                    c_high = float(input("Enter the largest parameter c: "))
+                    steps = int(input("Enter the number of values of c: "))
+                    runs = int(input("Enter the number of graphs per value of c: "))
+                    results_file = input("Enter the results file name: ")
+                    if n <= 1 or c_low <= 0 or c_high < c_low or steps <= 0 or runs <= 0:
+                        raise ValueError("Invalid inputs. n must be at least 2, c positive and the counts positive.")
+                    ensemble.run_ensemble(n, np.linspace(c_low, c_high, steps).tolist(), runs, results_file)
+                    print(f"Ensemble results written to '{results_file}'.")
+                except ValueError as e:
+                    print(f"Error: {e}")
+                except Exception as e:
+                    print(f"Error: {e}")
+
+            elif sub.lower() == "j":
+                try:
+                    if graph is None:
+                        raise ValueError("Graph is not defined.")
+                    query_file = input("Enter the query file (one 'source target' pair per line): ")
+                    output_file = input("Enter the results file name: ")
+                    # A lazily opened graph is already a binary file the workers can map
+                    source = graph.file_name if isinstance(graph, LazyGraph) else graph
+                    answered = batch_queries.run_batch(source, query_file, output_file)
+                    print(f"Answered {answered} queries into '{output_file}'.")
+                except ValueError as e:
+                    print(f"Error: {e}")
+                except Exception as e:
+                    print(f"Error: {e}")
+
+            elif sub.lower() == "k":
+                try:
+                    k = input(f"Enter the number of landmarks (default {landmarks.LANDMARKS}): ")
+                    k = int(k) if k else landmarks.LANDMARKS
+                    method = "degree" if input("Pick landmarks by degree or farthest-point? (d/f): ").lower() == "d" \
+                        else "farthest"
+                    graph_file = input("Enter the graph file to keep the index next to (empty to keep it in memory): ")
+                    if k <= 0:
+                        raise ValueError("The number of landmarks must be positive.")
+                    oracle = build_landmarks(graph, k, method, graph_file or None)
+                except ValueError as e:
+                    print(f"Error: {e}")
+
+            elif sub.lower() == "l":
+                try:
+                    if graph is None:
+                        raise ValueError("Graph is not defined.")
+                    samples = input("Enter the number of sampled sources (empty for exact): ")
+                    samples = int(samples) if samples else None
+                    if samples is not None and samples <= 0:
+                        raise ValueError("The number of sampled sources must be positive.")
+                    distance_statistics(graph, samples)
+                except ValueError as e:
+                    print(f"Error: {e}")
+
             else:
                 print("Invalid input. Please try again.")
 
@@ -798,6 +1219,17 @@ def main():
             except Exception as e:
                 print(f"Error: {e}")
 
+        elif choice == "7":
+            try:
+                file_name = input("Enter edge list file name: ")
+                out_file = input(f"Enter output file name (ending in {binary_graph.EXTENSION}): ")
+                directed = input("Is the graph directed? (y/n): ").lower() == "y"
+                memory = input("Enter the memory budget in MB (empty for the default): ")
+                memory_bytes = int(memory) * 1024 * 1024 if memory else external_sort.MEMORY_BYTES
+                convert_edgelist(file_name, out_file, directed, memory_bytes)
+            except ValueError as e:
+                print(f"Error: {e}")
+
         elif choice.lower() == "x":
             return None
 
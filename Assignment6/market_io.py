@@ -0,0 +1,104 @@
+import os
+import numpy as np
+from compressed_io import open_text
+
+# Markets with at least this many buyers keep their valuation matrix in a memory-mapped .npy sidecar
+SIDECAR_MIN_BUYERS = 4096
+# Bytes of text parsed per batch of valuation rows
+BATCH_BYTES = 16 * 1024 * 1024
+
+
+def _sidecar_names(file_name):
+    return f"{file_name}.valuations.npy", f"{file_name}.prices.npy"
+
+
+# Parse comma separated integers into a flat int64 array
+def _parse_integers(text):
+    return np.fromstring(text.replace(',', ' '), dtype=np.int64, sep=' ')
+
+
+# Open the sidecar of a market file when it is newer than the file itself
+def _open_sidecar(file_name):
+    valuations_name, prices_name = _sidecar_names(file_name)
+    try:
+        source_time = os.path.getmtime(file_name)
+        if os.path.getmtime(valuations_name) < source_time or os.path.getmtime(prices_name) < source_time:
+            return None
+        valuations = np.load(valuations_name, mmap_mode='r')
+        prices = np.load(prices_name)
+    except (OSError, ValueError):
+        return None
+    if valuations.shape != (len(prices), len(prices)):
+        return None
+    return prices, valuations
+
+
+# Parse n rows of valuations in batches into the matrix returned by allocate(dtype)
+def _read_valuations(file, n, allocate):
+    dtype = np.int32
+    valuations = allocate(dtype)
+    row = 0
+    while row < n:
+        lines = file.readlines(BATCH_BYTES)
+        if not lines:
+            break
+        lines = [line for line in lines if line.strip()][:n - row]
+        if not lines:
+            continue
+        values = _parse_integers(''.join(lines))
+        if len(values) != len(lines) * n:
+            raise ValueError(f"Expected {n} valuations per buyer in rows {row + 1}-{row + len(lines)}.")
+        if dtype == np.int32 and len(values) and \
+                (values.min() < np.iinfo(np.int32).min or values.max() > np.iinfo(np.int32).max):
+            # Values do not fit in int32, widen what has been read so far
+            dtype = np.int64
+            previous = np.array(valuations[:row], dtype=dtype)
+            del valuations
+            valuations = allocate(dtype)
+            valuations[:row] = previous
+        valuations[row:row + len(lines)] = values.reshape(len(lines), n)
+        row += len(lines)
+    if row != n:
+        raise ValueError(f"Expected {n} buyers, found {row}.")
+    return valuations
+
+
+# Read a market file ("n p1,...,pn" or "n" and the prices on separate lines, then n rows of valuations)
+# into a prices vector and an n x n int32 (int64 when needed) valuation matrix
+def read_market(file_name, sidecar_min_buyers=SIDECAR_MIN_BUYERS):
+    cached = _open_sidecar(file_name)
+    if cached is not None:
+        prices, valuations = cached
+        return len(prices), prices, valuations
+
+    with open_text(file_name) as file:
+        header = file.readline().split()
+        n = int(header[0])
+        prices = _parse_integers(header[1] if len(header) > 1 else file.readline())
+        if len(prices) != n:
+            raise ValueError(f"Expected {n} prices, found {len(prices)}.")
+
+        sidecar = n >= sidecar_min_buyers
+        valuations_name, prices_name = _sidecar_names(file_name)
+        # The sidecar is only moved into place once it has been completely written
+        temp_name = f"{valuations_name}.{os.getpid()}.tmp"
+
+        def allocate(dtype):
+            if sidecar:
+                return np.lib.format.open_memmap(temp_name, mode='w+', dtype=dtype, shape=(n, n))
+            return np.empty((n, n), dtype=dtype)
+
+        try:
+            valuations = _read_valuations(file, n, allocate)
+        except Exception:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+    if sidecar:
+        valuations.flush()
+        del valuations
+        np.save(prices_name, prices)
+        os.replace(temp_name, valuations_name)
+        valuations = np.load(valuations_name, mmap_mode='r')
+    return n, prices, valuations
@@ -0,0 +1,161 @@
+import numpy as np
+
+# Labels with more digits than this do not fit the int64 fast path
+MAX_NUMERIC_DIGITS = 18
+
+
+# Bidirectional label <-> dense id table. Labels are interned into one utf-8 byte buffer,
+# label u is buffer[offsets[u]:offsets[u + 1]]; the reverse index is a sorted permutation
+# of the ids (or of the values when every label is a plain integer), searched by bisection
+# A precomputed order (ids sorted by label string, as stored by the binary graph format) can be
+# passed in so lookups only touch the labels they bisect over
+class LabelTable:
+    def __init__(self, offsets, buffer, order=None):
+        self.offsets = offsets
+        self.buffer = buffer
+        self._order = order
+        self._values = None
+
+    @classmethod
+    def from_labels(cls, labels):
+        encoded = [str(label).encode('utf-8') for label in labels]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(label) for label in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, u):
+        return self.buffer[self.offsets[u]:self.offsets[u + 1]].tobytes().decode('utf-8')
+
+    # Decode every label from one copy of the buffer instead of slicing it label by label
+    def __iter__(self):
+        data = np.asarray(self.buffer).tobytes()
+        offsets = np.asarray(self.offsets).tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+    # Values of the labels when every label is a canonical non-negative integer, otherwise None
+    def _numeric_values(self):
+        n = len(self)
+        lengths = np.diff(self.offsets)
+        if n == 0 or lengths.min() < 1 or lengths.max() > MAX_NUMERIC_DIGITS:
+            return None
+        digits = np.asarray(self.buffer, dtype=np.int64) - ord('0')
+        if digits.min() < 0 or digits.max() > 9:
+            return None
+        # Leading zeros would make two different labels share a value
+        if np.any((digits[self.offsets[:-1]] == 0) & (lengths > 1)):
+            return None
+        rows = np.repeat(np.arange(n), lengths)
+        power = self.offsets[rows + 1] - 1 - np.arange(len(digits))
+        return np.add.reduceat(digits * 10 ** power, self.offsets[:-1])
+
+    # Ids sorted by label string
+    def sorted_order(self):
+        values = self._numeric_values()
+        if values is None:
+            return np.array(sorted(range(len(self)), key=self.__getitem__), dtype=np.int64)
+        # Digit strings compare like their values padded on the right, shorter prefixes first
+        lengths = np.diff(self.offsets)
+        padded = values * 10 ** (lengths.max() - lengths)
+        return np.lexsort((lengths, padded))
+
+    def _build_index(self):
+        values = self._numeric_values()
+        if values is not None:
+            self._order = np.argsort(values, kind='stable')
+            self._values = values[self._order]
+        else:
+            self._order = self.sorted_order()
+
+    # Dense id of a label, raises KeyError when the label is not in the table
+    def node_id(self, label):
+        if self._order is None:
+            self._build_index()
+        label = str(label)
+        if self._values is not None:
+            canonical = label.isascii() and label.isdigit() and len(label) <= MAX_NUMERIC_DIGITS
+            if not canonical or str(int(label)) != label:
+                raise KeyError(label)
+            k = int(np.searchsorted(self._values, int(label)))
+            if k < len(self._values) and self._values[k] == int(label):
+                return int(self._order[k])
+            raise KeyError(label)
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            if self[self._order[middle]] < label:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._order) and self[self._order[low]] == label:
+            return int(self._order[low])
+        raise KeyError(label)
+
+
+# Labels "0".."n-1" of generated graphs, computed on demand instead of stored
+# The interned offsets and buffer are only built when something needs them (writing a file)
+class RangeLabels(LabelTable):
+    def __init__(self, n):
+        self.n = n
+        self._offsets = None
+        self._buffer = None
+        self._order = None
+        self._values = None
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            self._build_buffer()
+        return self._offsets
+
+    @property
+    def buffer(self):
+        if self._buffer is None:
+            self._build_buffer()
+        return self._buffer
+
+    # Write the decimal digits of 0..n-1, one group of equally long numbers and one chunk at a time
+    def _build_buffer(self, chunk=1 << 20):
+        values = np.arange(self.n, dtype=np.int64)
+        lengths = np.ones(self.n, dtype=np.int64)
+        for k in range(1, 19):
+            lengths += values >= 10 ** k
+        offsets = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        buffer = np.empty(offsets[-1], dtype=np.uint8)
+        for digits in range(1, 19):
+            first, last = 10 ** (digits - 1) if digits > 1 else 0, min(10 ** digits, self.n)
+            for start in range(first, last, chunk):
+                block = np.arange(start, min(start + chunk, last), dtype=np.int64)
+                powers = 10 ** np.arange(digits - 1, -1, -1, dtype=np.int64)
+                text = (block[:, None] // powers) % 10 + ord('0')
+                buffer[offsets[start]:offsets[block[-1] + 1]] = text.ravel()
+        self._offsets, self._buffer = offsets, buffer
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return map(str, range(self.n))
+
+    def __getitem__(self, u):
+        if not 0 <= u < self.n:
+            raise IndexError(u)
+        return str(int(u))
+
+    # String order of "0".."n-1" from the values alone, without building the digit buffer
+    def sorted_order(self):
+        values = np.arange(self.n, dtype=np.int64)
+        lengths = np.ones(self.n, dtype=np.int64)
+        for k in range(1, 19):
+            lengths += values >= 10 ** k
+        return np.lexsort((lengths, values * 10 ** (lengths.max(initial=1) - lengths)))
+
+    def node_id(self, label):
+        label = str(label)
+        if not (label.isascii() and label.isdigit()) or str(int(label)) != label or int(label) >= self.n:
+            raise KeyError(label)
+        return int(label)
@@ -0,0 +1,64 @@
+import heapq
+from collections import defaultdict
+import shortest_paths
+from csr_graph import CSRGraph
+
+
+# OD demand {(origin, destination): volume} from a matrix whose rows are origins and columns destinations
+def demand_from_matrix(origins, destinations, matrix):
+    return {(o, d): volume for o, row in zip(origins, matrix) for d, volume in zip(destinations, row) if volume}
+
+
+# Dijkstra on a networkx graph (edge weight 'weight', 1 when missing) that stops once every target is settled
+# Returns {node: parent} and {node: distance} for the settled nodes
+def _networkx_tree(G, source, targets):
+    remaining = set(targets)
+    dist = {source: 0}
+    parent = {source: source}
+    settled = {}
+    heap = [(0, 0, source)]
+    counter = 1
+    while heap and remaining:
+        d, _, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled[u] = d
+        remaining.discard(u)
+        for v, data in G[u].items():
+            w = data.get('weight', 1)
+            if d + w < dist.get(v, float('inf')):
+                dist[v] = d + w
+                parent[v] = u
+                # The counter keeps nodes of different types out of the comparison
+                heapq.heappush(heap, (d + w, counter, v))
+                counter += 1
+    return {u: parent[u] for u in settled}, settled
+
+
+# Route an origin-destination demand all-or-nothing on shortest paths: one single-source search per
+# distinct origin, stopped as soon as all of that origin's destinations are settled.
+# Nodes are dense ids for CSR graphs and nodes otherwise.
+# Returns ({(origin, destination): (cost, path, volume)}, {(u, v): flow}); unreachable pairs get cost inf
+def route_demand(G, demand):
+    by_origin = defaultdict(list)
+    for (origin, destination), volume in demand.items():
+        by_origin[origin].append((destination, volume))
+    routes = {}
+    flows = defaultdict(float)
+    for origin, pairs in by_origin.items():
+        targets = [destination for destination, _ in pairs]
+        if isinstance(G, CSRGraph):
+            tree = shortest_paths.single_source_tree(G, origin, targets)
+            costs = None
+        else:
+            tree, costs = _networkx_tree(G, origin, targets)
+        for destination, volume in pairs:
+            path = shortest_paths.tree_path(tree, destination)
+            if path is None:
+                routes[(origin, destination)] = (float('inf'), None, volume)
+                continue
+            cost = shortest_paths.path_length(G, path) if costs is None else costs[destination]
+            routes[(origin, destination)] = (cost, path, volume)
+            for u, v in zip(path[:-1], path[1:]):
+                flows[(u, v)] += volume
+    return routes, dict(flows)
@@ -0,0 +1,162 @@
+import os
+import array
+import numpy as np
+import networkx as nx
+from concurrent.futures import ProcessPoolExecutor
+from csr_graph import CSRGraph, build_csr
+from compressed_io import detect_compression, open_text
+from node_labels import LabelTable
+
+# Upper bound on the bytes one worker parses per task
+RANGE_BYTES = 64 * 1024 * 1024
+
+
+# Split a file into byte ranges whose boundaries sit right after a newline
+def byte_ranges(file_name, parts):
+    size = os.path.getsize(file_name)
+    parts = max(1, min(parts, size))
+    boundaries = [0]
+    with open(file_name, 'rb') as file:
+        for i in range(1, parts):
+            position = size * i // parts
+            if position <= boundaries[-1]:
+                continue
+            # Move forward to the start of the next line
+            file.seek(position - 1)
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+# Weight in a weight column, None when the column is not a number (nx.write_edgelist writes "{}" there)
+def parse_weight(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+# Split one "source target [weight]" line into (source, target, weight), None for blank and comment lines
+# Text after '#' is a comment; weight is None when the line has no numeric weight column
+def split_edge_line(line, weight_column=2):
+    parts = line.split('#')[0].split()
+    if len(parts) < 2:
+        return None
+    weight = parse_weight(parts[weight_column]) if len(parts) > weight_column else None
+    return parts[0], parts[1], weight
+
+
+# Parse "source target [weight]" lines with block-local label interning
+# Returns the labels, the edge arrays, the weights and whether any line had a numeric weight
+def parse_edge_lines(lines, weight_column=2):
+    ids = {}
+    labels = []
+    src = array.array('q')
+    dst = array.array('q')
+    weights = array.array('d')
+    weighted = False
+    for line in lines:
+        edge = split_edge_line(line, weight_column)
+        if edge is None:
+            continue
+        for node, ends in ((edge[0], src), (edge[1], dst)):
+            u = ids.get(node)
+            if u is None:
+                u = ids[node] = len(labels)
+                labels.append(node)
+            ends.append(u)
+        weight = edge[2]
+        weighted |= weight is not None
+        # Edges without a weight count as weight 1, as networkx does for a missing weight attribute
+        weights.append(1.0 if weight is None else weight)
+    return (labels, np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64),
+            np.frombuffer(weights, dtype=np.float64), weighted)
+
+
+# Read a weighted edge list into a networkx DiGraph, line by line with the same line rules as the CSR reader
+def read_weighted_digraph_nx(file_name, weight_column=2):
+    G = nx.DiGraph()
+    with open_text(file_name) as file:
+        for line in file:
+            edge = split_edge_line(line, weight_column)
+            if edge is None:
+                continue
+            source, target, weight = edge
+            # Keep the weight column when it holds a number
+            if weight is not None:
+                G.add_edge(source, target, weight=weight)
+            else:
+                G.add_edge(source, target)
+    return G
+
+
+# Parse the lines in one byte range of a file
+def parse_edge_range(file_name, start, end, weight_column=2):
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return parse_edge_lines(data.decode('utf-8').splitlines(), weight_column)
+
+
+def _parse_task(task):
+    return parse_edge_range(*task)
+
+
+# Compressed files cannot be split into byte ranges; parse the decompressed stream block by block instead
+def _parse_stream(file_name, weight_column):
+    with open_text(file_name) as file:
+        while True:
+            lines = file.readlines(RANGE_BYTES)
+            if not lines:
+                break
+            yield parse_edge_lines(lines, weight_column)
+
+
+# Read a weighted edge list into a directed CSR graph, parsing byte ranges in worker processes
+# workers=1 parses in this process; both paths produce the same graph
+# The graph is unweighted (weights None) when no line has a numeric weight, like the serial reader
+def read_weighted_digraph_csr(file_name, workers=None, weight_column=2):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if detect_compression(file_name) is not None:
+        results = _parse_stream(file_name, weight_column)
+    else:
+        parts = max(workers, -(-os.path.getsize(file_name) // RANGE_BYTES))
+        tasks = [(file_name, start, end, weight_column) for start, end in byte_ranges(file_name, parts)]
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_parse_task, tasks))
+        else:
+            results = [_parse_task(task) for task in tasks]
+
+    # Merge the ranges in file order so node ids follow first appearance, as in the serial reader
+    ids = {}
+    labels = []
+    src_chunks, dst_chunks, weight_chunks = [], [], []
+    weighted = False
+    for local_labels, src, dst, weights, block_weighted in results:
+        mapping = np.empty(len(local_labels), dtype=np.int64)
+        for u, node in enumerate(local_labels):
+            v = ids.get(node)
+            if v is None:
+                v = ids[node] = len(labels)
+                labels.append(node)
+            mapping[u] = v
+        src_chunks.append(mapping[src])
+        dst_chunks.append(mapping[dst])
+        weight_chunks.append(weights)
+        weighted |= block_weighted
+    del ids
+    labels = LabelTable.from_labels(labels)
+    src = np.concatenate(src_chunks) if src_chunks else np.empty(0, dtype=np.int64)
+    dst = np.concatenate(dst_chunks) if dst_chunks else np.empty(0, dtype=np.int64)
+    weights = None
+    if weighted:
+        weights = np.concatenate(weight_chunks)
+    indptr, indices, weights = build_csr(src, dst, len(labels), directed=True, weights=weights)
+    return CSRGraph(indptr, indices, labels, weights, directed=True)
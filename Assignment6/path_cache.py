@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import networkx as nx
+import shortest_paths
+from csr_graph import CSRGraph
+
+# Default memory cap of the cached shortest-path trees
+CACHE_BYTES = 256 * 1024 * 1024
+# Rough size of one entry of a dict based tree
+DICT_ENTRY_BYTES = 100
+# A source gets a cached tree on its second query, a one-off query is left to the point-to-point search
+REPEAT_QUERIES = 2
+# Sources remembered while waiting for a repeat query; the memory is dropped when it grows past this
+MAX_PENDING_SOURCES = 1 << 16
+
+
+# Version of a graph; every operation that changes a graph in place bumps it (CSR graphs never change)
+def graph_version(G):
+    graph = getattr(G, 'graph', None)
+    return 0 if graph is None else graph.get('version', 0)
+
+
+def bump_version(G):
+    G.graph['version'] = graph_version(G) + 1
+
+
+# Shortest-path tree of a networkx graph as {node: parent}, weighted graphs use their weights
+def _networkx_tree(G, source):
+    if nx.is_weighted(G):
+        predecessors = nx.dijkstra_predecessor_and_distance(G, source)[0]
+    else:
+        predecessors = nx.predecessor(G, source)
+    tree = {node: parents[0] for node, parents in predecessors.items() if parents}
+    tree[source] = source
+    return tree
+
+
+def _tree_bytes(tree):
+    if isinstance(tree, dict):
+        return len(tree) * DICT_ENTRY_BYTES
+    return tree.nbytes
+
+
+# LRU memo of single-source shortest-path trees keyed by (graph version, source)
+# A cached tree answers every later target from the same source in O(path length); a different graph
+# or a new version of the same graph drops the trees of the old one
+class PathCache:
+    def __init__(self, max_bytes=CACHE_BYTES, repeat_queries=REPEAT_QUERIES):
+        self.max_bytes = max_bytes
+        self.repeat_queries = repeat_queries
+        self._trees = OrderedDict()
+        self._queries = {}
+        self._graph = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._trees = OrderedDict()
+        self._queries = {}
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._trees)
+
+    def _cached(self, G, key):
+        if G is not self._graph:
+            self.clear()
+            self._graph = G
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            self.hits += 1
+            return tree
+        self.misses += 1
+        return None
+
+    # Shortest-path tree from source (a dense id for CSR graphs, a node otherwise)
+    def tree(self, G, source):
+        key = (graph_version(G), source)
+        tree = self._cached(G, key)
+        return tree if tree is not None else self._build(G, key)
+
+    # Cached tree from source, built once the source has been queried repeat_queries times
+    # Returns None for the earlier queries, which the caller answers with a point-to-point search
+    def lookup(self, G, source):
+        key = (graph_version(G), source)
+        tree = self._cached(G, key)
+        if tree is not None:
+            return tree
+        queries = self._queries.pop(key, 0) + 1
+        if queries >= self.repeat_queries:
+            return self._build(G, key)
+        if len(self._queries) >= MAX_PENDING_SOURCES:
+            self._queries = {}
+        self._queries[key] = queries
+        return None
+
+    def _build(self, G, key):
+        version, source = key
+        # Trees of older versions can never be hit again
+        for old in [old for old in self._trees if old[0] != version]:
+            self._bytes -= _tree_bytes(self._trees.pop(old))
+        self._queries = {old: count for old, count in self._queries.items() if old[0] == version}
+        if isinstance(G, CSRGraph):
+            tree = shortest_paths.single_source_tree(G, source)
+        else:
+            tree = _networkx_tree(G, source)
+        self._trees[key] = tree
+        self._bytes += _tree_bytes(tree)
+        # Evict the least recently used trees, but always keep the one just computed
+        while self._bytes > self.max_bytes and len(self._trees) > 1:
+            self._bytes -= _tree_bytes(self._trees.popitem(last=False)[1])
+        return tree
+
+    # Shortest path from source to target, None when target is not reachable
+    def path(self, G, source, target):
+        return shortest_paths.tree_path(self.tree(G, source), target)
@@ -0,0 +1,174 @@
+import heapq
+import numpy as np
+
+# Searches report the number of nodes they settled next to the path, to compare against one-sided searches
+
+
+# Expand a BFS frontier by one level: returns the newly reached nodes and their parents (first parent wins)
+def _expand(G, frontier, parent):
+    indptr, indices = G.indptr, G.indices
+    starts, ends = indptr[frontier], indptr[frontier + 1]
+    counts = ends - starts
+    owners = np.repeat(frontier, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    candidates = np.asarray(indices[np.repeat(starts, counts) + offsets], dtype=np.int64)
+    new = parent[candidates] < 0
+    candidates, owners = candidates[new], owners[new]
+    order = np.argsort(candidates, kind='stable')
+    candidates, owners = candidates[order], owners[order]
+    first = np.ones(len(candidates), dtype=bool)
+    first[1:] = candidates[1:] != candidates[:-1]
+    candidates, owners = candidates[first], owners[first]
+    parent[candidates] = owners
+    return candidates
+
+
+# Path through the meeting node, following forward parents back to the source and backward parents to the target
+def _join(forward, backward, meet):
+    path = [meet]
+    while forward[path[-1]] != path[-1]:
+        path.append(int(forward[path[-1]]))
+    path.reverse()
+    while backward[path[-1]] != path[-1]:
+        path.append(int(backward[path[-1]]))
+    return path
+
+
+# Bidirectional breadth-first search on a CSR graph between dense ids
+# Each step expands the smaller frontier one whole level; returns (id path or None, settled nodes)
+def bidirectional_bfs(G, source, target):
+    n = G.number_of_nodes()
+    if source == target:
+        return [source], 1
+    graphs = (G, G.reverse())
+    parents = (np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64))
+    # Depth of every reached node, to pick the best meeting node of a level
+    depths = (np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64))
+    frontiers = [np.array([source], dtype=np.int64), np.array([target], dtype=np.int64)]
+    for side, start in ((0, source), (1, target)):
+        parents[side][start] = start
+        depths[side][start] = 0
+    levels = [0, 0]
+    settled = 2
+    while len(frontiers[0]) and len(frontiers[1]):
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        other = 1 - side
+        frontiers[side] = _expand(graphs[side], frontiers[side], parents[side])
+        levels[side] += 1
+        depths[side][frontiers[side]] = levels[side]
+        settled += len(frontiers[side])
+        met = frontiers[side][parents[other][frontiers[side]] >= 0]
+        if len(met):
+            meet = int(met[np.argmin(depths[other][met])])
+            return _join(parents[0], parents[1], meet), settled
+    return None, settled
+
+
+# Bidirectional Dijkstra with binary heaps over int ids on a weighted CSR graph (weights must be non-negative)
+# Stops once the two heap tops together reach the best path found; returns (id path or None, settled nodes)
+def bidirectional_dijkstra(G, source, target):
+    if source == target:
+        return [source], 1
+    sides = []
+    for graph, start in ((G, source), (G.reverse(), target)):
+        sides.append({'graph': graph, 'dist': {start: 0.0}, 'parent': {start: start}, 'done': set(),
+                      'heap': [(0.0, start)]})
+    best, meet = float('inf'), None
+    settled = 0
+    while sides[0]['heap'] and sides[1]['heap']:
+        if sides[0]['heap'][0][0] + sides[1]['heap'][0][0] >= best:
+            break
+        # Advance the side with the smaller heap
+        side, other = (sides[0], sides[1]) if len(sides[0]['heap']) <= len(sides[1]['heap']) else (sides[1], sides[0])
+        d, u = heapq.heappop(side['heap'])
+        if u in side['done']:
+            continue
+        side['done'].add(u)
+        settled += 1
+        graph, dist, parent = side['graph'], side['dist'], side['parent']
+        start, end = graph.indptr[u], graph.indptr[u + 1]
+        weights = [1.0] * (end - start) if graph.weights is None else graph.weights[start:end].tolist()
+        for v, w in zip(graph.indices[start:end].tolist(), weights):
+            if d + w < dist.get(v, float('inf')):
+                dist[v] = d + w
+                parent[v] = u
+                heapq.heappush(side['heap'], (d + w, v))
+            if v in other['dist'] and dist[v] + other['dist'][v] < best:
+                best, meet = dist[v] + other['dist'][v], v
+    if meet is None:
+        return None, settled
+    path = [meet]
+    while sides[0]['parent'][path[-1]] != path[-1]:
+        path.append(sides[0]['parent'][path[-1]])
+    path.reverse()
+    while sides[1]['parent'][path[-1]] != path[-1]:
+        path.append(sides[1]['parent'][path[-1]])
+    return path, settled
+
+
+# Shortest path between dense ids, bidirectional Dijkstra when the graph is weighted and BFS otherwise
+def shortest_path(G, source, target):
+    if G.weights is not None:
+        return bidirectional_dijkstra(G, source, target)
+    return bidirectional_bfs(G, source, target)
+
+
+# Length of an id path, summing the edge weights when the graph has them
+def path_length(G, path):
+    if G.weights is None:
+        return len(path) - 1
+    total = 0.0
+    for u, v in zip(path[:-1], path[1:]):
+        start, end = G.indptr[u], G.indptr[u + 1]
+        k = start + int(np.searchsorted(G.indices[start:end], v))
+        total += float(G.weights[k])
+    return total
+
+
+# Shortest-path tree from source, grown until every node in targets is settled (the whole reachable
+# graph when targets is None). BFS on unweighted graphs gives a parent array (-1 = not reached),
+# Dijkstra on weighted ones a parent dict
+def single_source_tree(G, source, targets=None):
+    remaining = None if targets is None else set(targets) - {source}
+    if G.weights is None:
+        parent = np.full(G.number_of_nodes(), -1, dtype=np.int64)
+        parent[source] = source
+        frontier = np.array([source], dtype=np.int64)
+        while len(frontier) and (remaining is None or remaining):
+            frontier = _expand(G, frontier, parent)
+            if remaining is not None:
+                remaining = {u for u in remaining if parent[u] < 0}
+        return parent
+    parent = {source: source}
+    dist = {source: 0.0}
+    done = set()
+    heap = [(0.0, source)]
+    while heap and (remaining is None or remaining):
+        d, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        if remaining is not None:
+            remaining.discard(u)
+        start, end = G.indptr[u], G.indptr[u + 1]
+        for v, w in zip(G.indices[start:end].tolist(), G.weights[start:end].tolist()):
+            if d + w < dist.get(v, float('inf')):
+                dist[v] = d + w
+                parent[v] = u
+                heapq.heappush(heap, (d + w, v))
+    # Nodes still waiting in the heap have tentative parents, keep only the settled ones
+    return {u: parent[u] for u in done}
+
+
+# Path from the root of a shortest-path tree to target, None when target was not reached
+def tree_path(parent, target):
+    if isinstance(parent, dict):
+        if target not in parent:
+            return None
+    elif parent[target] < 0:
+        return None
+    path = [target]
+    while parent[path[-1]] != path[-1]:
+        step = parent[path[-1]]
+        path.append(step if isinstance(parent, dict) else int(step))
+    return path[::-1]
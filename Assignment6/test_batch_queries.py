@@ -0,0 +1,28 @@
+import binary_graph
+import batch_queries
+import graph_delta
+from csr_graph import read_graph_csr
+
+
+# Result lines of a batch run keyed by (source, target)
+def _results(output_file):
+    with open(output_file) as file:
+        return {tuple(line.split()[:2]): line.split()[2:] for line in file}
+
+
+def test_logged_edits_are_applied(tmp_path):
+    adjacency = tmp_path / 'graph.txt'
+    adjacency.write_text('a b\nb c\nc d\n')
+    snapshot = str(tmp_path / ('graph' + binary_graph.EXTENSION))
+    binary_graph.write_binary_graph(read_graph_csr(str(adjacency)), snapshot)
+    log = graph_delta.delta_log(snapshot)
+    log.remove_edge('b', 'c')
+    log.add_edge('a', 'd')
+    queries = tmp_path / 'queries.txt'
+    queries.write_text('a c\na d\n')
+    output = str(tmp_path / 'results.txt')
+    assert batch_queries.run_batch(snapshot, str(queries), output, workers=1) == 2
+    results = _results(output)
+    # Without the edits the path would be a b c
+    assert results[('a', 'c')] == ['2', 'a', 'd', 'c']
+    assert results[('a', 'd')] == ['1', 'a', 'd']
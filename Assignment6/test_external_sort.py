@@ -0,0 +1,24 @@
+import external_sort
+
+
+# Edge pairs of a text as a list of (u, v) tuples
+def _pairs(text):
+    src, dst = external_sort._parse_pairs(text)
+    return list(zip(src.tolist(), dst.tolist()))
+
+
+def test_plain_two_columns():
+    assert _pairs('1 2\n3 4\n') == [(1, 2), (3, 4)]
+    assert _pairs('1 2\r\n3\t4') == [(1, 2), (3, 4)]
+
+
+def test_mixed_columns_and_blank_lines():
+    # Same number of tokens as a plain two column list, but not two per line
+    assert _pairs('1 2 3 4\n\n5 6\n') == [(1, 2), (5, 6)]
+    assert _pairs('1\n2 3 4\n') == [(2, 3)]
+    assert _pairs('1 2\n\n') == [(1, 2)]
+    assert _pairs('\n1 2 7\n3 4\n') == [(1, 2), (3, 4)]
+
+
+def test_comments():
+    assert _pairs('# header\n1 2\n3 4 # note\n') == [(1, 2), (3, 4)]
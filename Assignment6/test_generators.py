@@ -0,0 +1,13 @@
+import os
+import generators
+
+
+def test_slot_chunks_without_slots():
+    assert generators._slot_chunks(0, 0.0) == []
+    assert generators._slot_chunks(0, 0.5) == []
+    assert generators._slot_chunks(5, 0.0) == [(0, 5)]
+
+
+def test_empty_random_graphs(tmp_path):
+    assert generators.erdos_renyi_file(1, 0.0, os.path.join(tmp_path, 'one.bin'), seed=1, workers=1) == (1, 0)
+    assert generators.erdos_renyi_file(10, 0.0, os.path.join(tmp_path, 'ten.bin'), seed=1, workers=1) == (10, 0)
@@ -0,0 +1,37 @@
+import networkx as nx
+import graph_cache
+
+
+# Reader that counts its calls, to tell cache hits from parses
+def _counting_reader(calls):
+    def read(file_name):
+        calls.append(file_name)
+        G = nx.DiGraph()
+        with open(file_name) as file:
+            for line in file:
+                u, v, weight = line.split()
+                G.add_edge(u, v, weight=float(weight))
+        return G
+    return read
+
+
+def test_networkx_parse_is_cached(tmp_path):
+    file_name = tmp_path / 'graph.txt'
+    file_name.write_text('a b 1.5\nb c 2\n')
+    calls = []
+    first = graph_cache.cached_read(str(file_name), 'digraph', _counting_reader(calls), str(tmp_path / 'cache'))
+    second = graph_cache.cached_read(str(file_name), 'digraph', _counting_reader(calls), str(tmp_path / 'cache'))
+    assert len(calls) == 1
+    assert isinstance(second, nx.DiGraph)
+    assert sorted(second.edges(data='weight')) == sorted(first.edges(data='weight'))
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    file_name = tmp_path / 'graph.txt'
+    file_name.write_text('a b 1\n')
+    calls = []
+    graph_cache.cached_read(str(file_name), 'digraph', _counting_reader(calls), str(tmp_path / 'cache'))
+    file_name.write_text('a b 1\nb c 2\n')
+    G = graph_cache.cached_read(str(file_name), 'digraph', _counting_reader(calls), str(tmp_path / 'cache'))
+    assert len(calls) == 2
+    assert G.number_of_edges() == 2
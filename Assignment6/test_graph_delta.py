@@ -0,0 +1,39 @@
+import binary_graph
+import graph_delta
+from csr_graph import read_graph_csr
+
+
+# Snapshot of an unweighted adjacency list, returns its file name
+def _snapshot(tmp_path, text):
+    adjacency = tmp_path / 'graph.txt'
+    adjacency.write_text(text)
+    file_name = str(tmp_path / ('graph' + binary_graph.EXTENSION))
+    binary_graph.write_binary_graph(read_graph_csr(str(adjacency)), file_name)
+    return file_name
+
+
+# {(u, v): weight} of a CSR graph's networkx copy
+def _weights(G):
+    return {tuple(sorted((str(u), str(v)))): w for u, v, w in G.to_networkx().edges(data='weight')}
+
+
+def test_weighted_edit_promotes_unweighted_snapshot(tmp_path):
+    file_name = _snapshot(tmp_path, 'a b\nb c\n')
+    log = graph_delta.DeltaLog(file_name)
+    log.add_edge('c', 'd', 2.5)
+    log.add_edge('a', 'c')
+    log.flush()
+    G = graph_delta.read_delta_graph(file_name)
+    assert G.weights is not None
+    assert _weights(G) == {('a', 'b'): 1.0, ('b', 'c'): 1.0, ('c', 'd'): 2.5, ('a', 'c'): 1.0}
+
+
+def test_unweighted_edits_keep_snapshot_unweighted(tmp_path):
+    file_name = _snapshot(tmp_path, 'a b\nb c\n')
+    log = graph_delta.DeltaLog(file_name)
+    log.remove_edge('a', 'b')
+    log.add_edge('c', 'd')
+    log.flush()
+    G = graph_delta.read_delta_graph(file_name)
+    assert G.weights is None
+    assert _weights(G) == {('b', 'c'): None, ('c', 'd'): None}
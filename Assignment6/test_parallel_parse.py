@@ -0,0 +1,40 @@
+import parallel_parse
+
+EDGE_LIST = """# weighted edge list
+a b 1.5
+
+b c 2  # trailing comment
+c a {}
+   
+# d e 9
+d a 0.25
+"""
+
+
+# (source, target, weight) triples of a graph, weight None when the edge has no weight
+def _edges(G):
+    return sorted((str(u), str(v), data.get('weight')) for u, v, data in G.edges(data=True))
+
+
+def test_split_edge_line():
+    assert parallel_parse.split_edge_line('a b 1.5\n') == ('a', 'b', 1.5)
+    assert parallel_parse.split_edge_line('a b {}\n') == ('a', 'b', None)
+    assert parallel_parse.split_edge_line('a b # 3\n') == ('a', 'b', None)
+    assert parallel_parse.split_edge_line('# a b 3\n') is None
+    assert parallel_parse.split_edge_line('  \n') is None
+    assert parallel_parse.split_edge_line('a\n') is None
+
+
+def test_serial_and_parallel_readers_agree(tmp_path, monkeypatch):
+    file_name = tmp_path / 'edges.txt'
+    file_name.write_text(EDGE_LIST)
+    serial = parallel_parse.read_weighted_digraph_nx(str(file_name))
+    assert _edges(serial) == [('a', 'b', 1.5), ('b', 'c', 2.0), ('c', 'a', None), ('d', 'a', 0.25)]
+    # Small byte ranges so the file is split into several tasks
+    monkeypatch.setattr(parallel_parse, 'RANGE_BYTES', 16)
+    for workers in (1, 2):
+        G = parallel_parse.read_weighted_digraph_csr(str(file_name), workers)
+        # The CSR graph stores weight 1 for the edge without a weight, as networkx treats a missing weight
+        expected = [(u, v, 1.0 if weight is None else weight) for u, v, weight in _edges(serial)]
+        assert _edges(G.to_networkx()) == expected
+        assert [str(label) for label in G.labels] == list(serial.nodes())